@@ -1,5 +1,5 @@
 from pathlib import Path
-from decouple import config as env
+from decouple import Csv, config as env
 import dj_database_url
 from django.core.management.utils import get_random_secret_key
 from urllib.parse import urlparse
@@ -96,6 +96,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # request-scoped memo of resolved property image URLs (listings/images.py)
+    "listings.middleware.ImageURLMemoMiddleware",
 ]
 
 # ------------------------
@@ -150,6 +152,47 @@ TEMPLATES = [
     },
 ]
 
+# ------------------------
+# CACHE
+# ------------------------
+# The default LocMem cache lives inside each process: a page cached by one gunicorn worker is not
+# dropped when another worker (or a management command such as sync_media) bumps the catalogue
+# version, so it is served until its TTL runs out. Point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache to make invalidation reach every process, e.g.
+# django.core.cache.backends.filebased.FileBasedCache + /var/tmp/kamlux-cache (one host), or
+# django.core.cache.backends.redis.RedisCache + redis://... (needs the redis package).
+CACHES = {
+    "default": {
+        "BACKEND": env("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env("CACHE_LOCATION", default=""),
+    }
+}
+
+# ------------------------
+# LISTINGS
+# ------------------------
+# Keyset (cursor) pagination on /properties/: constant cost per page on large catalogues
+LISTINGS_CURSOR_PAGINATION = env("LISTINGS_CURSOR_PAGINATION", default=False, cast=bool)
+# Widths (px) offered in <img srcset> by the cover_srcset tag (Cloudinary transforms or local derivatives)
+LISTINGS_IMAGE_WIDTHS = env("LISTINGS_IMAGE_WIDTHS", default="320,480,768,1024,1600", cast=Csv(int))
+# Admin uploads are auto-oriented, EXIF-stripped and re-encoded before storage (listings/image_utils.py)
+LISTINGS_UPLOAD_MAX_EDGE = env("LISTINGS_UPLOAD_MAX_EDGE", default=2048, cast=int)
+LISTINGS_UPLOAD_JPEG_QUALITY = env("LISTINGS_UPLOAD_JPEG_QUALITY", default=82, cast=int)
+# Local (FileSystemStorage) resized variants, rendered on demand and LRU-evicted past the byte budget
+LISTINGS_DERIVATIVE_CACHE_DIR = env("LISTINGS_DERIVATIVE_CACHE_DIR", default=str(BASE_DIR / "var" / "derivatives"))
+LISTINGS_DERIVATIVE_CACHE_MAX_BYTES = env("LISTINGS_DERIVATIVE_CACHE_MAX_BYTES", default=512 * 1024 * 1024, cast=int)
+# Uploads reuse an existing Cloudinary asset with the same SHA-256; also match near-identical photos (dHash)?
+LISTINGS_MEDIA_DEDUP_PERCEPTUAL = env("LISTINGS_MEDIA_DEDUP_PERCEPTUAL", default=False, cast=bool)
+# Local cache of Cloudinary existence checks (listings/cloud_resources.py), shared by the media commands
+LISTINGS_CLOUDINARY_RESOURCE_CACHE = env(
+    "LISTINGS_CLOUDINARY_RESOURCE_CACHE", default=str(BASE_DIR / "var" / "cloudinary_resources.json")
+)
+LISTINGS_CLOUDINARY_RESOURCE_TTL = env("LISTINGS_CLOUDINARY_RESOURCE_TTL", default=60 * 60 * 24, cast=int)
+# Compute blurred image placeholders (listings/lqip.py) when a property's images change on save.
+# Off by default: it fetches every changed image inside the admin request. Without it, run
+# `manage.py compute_lqip` periodically (e.g. cron); until then changed images just show no preview.
+LISTINGS_LQIP_ON_SAVE = env("LISTINGS_LQIP_ON_SAVE", default=False, cast=bool)
+
 # ------------------------
 # EMAIL CONFIG
 # ------------------------
@@ -1,5 +1,9 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.template.defaultfilters import filesizeformat
 from django.utils.html import format_html
+from .image_utils import optimize_uploads
+from .images import IMAGE_FIELDS, responsive_attrs
+from .media_index import store_uploads
 from .models import Property, UnitOption, Lead
 
 # --- Inline for UnitOption ---
@@ -25,34 +29,52 @@ class PropertyAdmin(admin.ModelAdmin):
 
     readonly_fields = ("cover_thumb", "gallery1_thumb", "gallery2_thumb")
 
-    # --- Thumbnails ---
-    def thumbnail_display(self, obj):
-        if obj.cover and hasattr(obj.cover, "url"):
+    # --- Thumbnails (read from the image_urls persisted on save) ---
+    def _thumb(self, obj, field, width, radius):
+        url = obj.image_url_map().get(field)
+        if url:
+            # 1x and 2x (retina) copies instead of the full-size original
+            attrs = responsive_attrs(url, sizes=f"{width}px", widths=(width, width * 2))
             return format_html(
-                '<img src="{}" width="60" style="object-fit: cover; border-radius: 4px;">',
-                obj.cover.url
+                '<img {} width="{}" style="object-fit: cover; border-radius: {}px;">', attrs, width, radius
             )
         return "-"
+
+    def thumbnail_display(self, obj):
+        return self._thumb(obj, "cover", 60, 4)
     thumbnail_display.short_description = "Thumbnail"
 
     def cover_thumb(self, obj):
-        if obj.cover and hasattr(obj.cover, "url"):
-            return format_html('<img src="{}" width="80" style="object-fit: cover; border-radius: 8px;">', obj.cover.url)
-        return "-"
+        return self._thumb(obj, "cover", 80, 8)
     cover_thumb.short_description = "Cover"
 
     def gallery1_thumb(self, obj):
-        if obj.gallery1 and hasattr(obj.gallery1, "url"):
-            return format_html('<img src="{}" width="80" style="object-fit: cover; border-radius: 4px;">', obj.gallery1.url)
-        return "-"
+        return self._thumb(obj, "gallery1", 80, 4)
     gallery1_thumb.short_description = "Gallery 1"
 
     def gallery2_thumb(self, obj):
-        if obj.gallery2 and hasattr(obj.gallery2, "url"):
-            return format_html('<img src="{}" width="80" style="object-fit: cover; border-radius: 4px;">', obj.gallery2.url)
-        return "-"
+        return self._thumb(obj, "gallery2", 80, 4)
     gallery2_thumb.short_description = "Gallery 2"
 
+    # --- Upload optimisation ---
+    def save_model(self, request, obj, form, change):
+        # resize/re-encode new cover/gallery uploads (in parallel) before they are stored
+        fields = [f for f in IMAGE_FIELDS if f in form.changed_data]
+        optimized = optimize_uploads(obj, fields)
+        # upload only content Cloudinary does not already have (listings/media_index.py)
+        reused = [f for f, was_reused in store_uploads(obj, fields).items() if was_reused]
+        super().save_model(request, obj, form, change)
+        if reused:
+            self.message_user(request, f"Reused existing Cloudinary images for: {', '.join(reused)}", messages.INFO)
+        for field, result in optimized.items():
+            saved = result.original_size - len(result.jpeg)
+            self.message_user(
+                request,
+                f"{field}: {filesizeformat(result.original_size)} → {filesizeformat(len(result.jpeg))} JPEG "
+                f"({'saved ' + filesizeformat(saved) if saved > 0 else 'no saving'})",
+                messages.INFO,
+            )
+
     # --- Featured Badge ---
     def is_featured_badge(self, obj):
         if obj.is_featured:
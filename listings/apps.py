@@ -5,5 +5,6 @@ class ListingsConfig(AppConfig):
     name = 'listings'
 
     def ready(self):
+        from . import signals  # noqa: F401
         from .startup import create_admin_user
         create_admin_user()
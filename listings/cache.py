@@ -0,0 +1,104 @@
+# listings/cache.py
+"""
+Cache keys for listing data that must go stale when the catalogue changes.
+
+Rather than hunting down every cached entry on a write, each key embeds a
+catalogue version number. listings.signals bumps the version whenever a
+Property or UnitOption is saved or deleted, so old entries are never read
+again and simply age out of the cache.
+
+That only reaches processes sharing the cache backend. With the default
+per-process LocMem cache, a bump in one gunicorn worker or in a management
+command leaves every other process on its old version until the cached
+entries expire; configure a shared backend (settings.CACHES) to avoid it.
+"""
+import hashlib
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY = "listings:catalogue-version"
+
+
+def catalogue_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def bump_catalogue_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # key missing (cold cache / evicted): any fresh value invalidates old keys
+        cache.set(VERSION_KEY, 2, None)
+        return 2
+
+
+def process_local_warning():
+    """
+    Note for management commands that invalidate cached pages, or None when the cache is shared.
+    With a per-process backend their invalidation only clears their own memory.
+    """
+    if not isinstance(caches["default"], (LocMemCache, DummyCache)):
+        return None
+    return ("Note: the cache backend is local to each process, so the web server keeps serving its cached "
+            "home/list/detail pages until they expire (up to 24h). Restart it to see the changes now, or "
+            "configure a shared CACHE_BACKEND.")
+
+
+def versioned_key(prefix, *parts):
+    """Cache key for `prefix` + `parts` that is only valid for the current catalogue version."""
+    digest = hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f"listings:{prefix}:v{catalogue_version()}:{digest}"
+
+
+# ------------------------
+# property_list result cache
+# ------------------------
+RESULT_TTL = 60 * 15
+# Above this many matches we don't cache the id list (keeps entries small)
+RESULT_MAX_IDS = 5000
+# Cached in place of the ids when there are more than that, so later requests skip the probe query
+TOO_LARGE = "too-large"
+STATS_KEYS = {"hits": "listings:stats:result-cache:hits", "misses": "listings:stats:result-cache:misses"}
+
+
+def _count(stat):
+    key = STATS_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def result_cache_stats():
+    """Hit/miss counters for the property_list result cache (process-wide for LocMem)."""
+    hits = cache.get(STATS_KEYS["hits"], 0)
+    misses = cache.get(STATS_KEYS["misses"], 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 3) if total else None}
+
+
+def cached_result_ids(filter_key, qs):
+    """
+    Ordered primary keys matching `qs`, cached per filter state and catalogue version.
+
+    Returns None when the result is too large to cache; callers then paginate
+    the queryset directly.
+    """
+    key = versioned_key("results", filter_key)
+    ids = cache.get(key)
+    if ids is not None:
+        _count("hits")
+        return None if ids == TOO_LARGE else ids
+    _count("misses")
+    ids = list(qs.values_list("pk", flat=True)[:RESULT_MAX_IDS + 1])
+    if len(ids) > RESULT_MAX_IDS:
+        cache.set(key, TOO_LARGE, RESULT_TTL)
+        return None
+    cache.set(key, ids, RESULT_TTL)
+    return ids
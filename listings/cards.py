@@ -0,0 +1,47 @@
+# listings/cards.py
+"""
+Per-card fragment cache for property cards.
+
+A card's cache key is (pk, updated_at), so any save of the property yields a
+new key and the old fragment is never read again. A whole page of cards is
+fetched with one cache.get_many(); only the misses are rendered, and they are
+written back with one cache.set_many().
+"""
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .images import resolve_many
+
+CARD_TEMPLATE = "listings/partials/_property_card.html"
+# bump when _property_card.html changes, so deploys don't serve old markup
+CARD_TEMPLATE_VERSION = 3
+CARD_TTL = 60 * 60 * 24
+
+
+def card_key(p):
+    stamp = p.updated_at.timestamp() if p.updated_at else 0
+    return f"listings:card:t{CARD_TEMPLATE_VERSION}:{p.pk}:{stamp}"
+
+
+def render_cards(properties):
+    """Rendered card HTML for each property, in order, in one cache round-trip."""
+    properties = list(properties)
+    keys = [card_key(p) for p in properties]
+    cached = cache.get_many(keys)
+
+    # resolve image URLs for every card about to be rendered in one pass
+    resolve_many(p for key, p in zip(keys, properties) if key not in cached)
+
+    missing = {}
+    cards = []
+    for key, p in zip(keys, properties):
+        html = cached.get(key)
+        if html is None:
+            html = render_to_string(CARD_TEMPLATE, {"property": p})
+            missing[key] = str(html)
+        cards.append(mark_safe(html))
+
+    if missing:
+        cache.set_many(missing, CARD_TTL)
+    return cards
@@ -0,0 +1,124 @@
+# listings/cloud_resources.py
+"""
+Batched "does this asset exist on Cloudinary?" checks, with a local cache.
+
+Checking assets one api.resource() call at a time costs an Admin API
+request per image field, and the Admin API is rate limited per hour.
+lookup() asks api.resources_by_ids for up to 100 public ids per request and
+remembers each answer (public_id -> version, bytes, format, or "missing") in
+a JSON file under var/ for LISTINGS_CLOUDINARY_RESOURCE_TTL seconds. The
+upload, audit and export commands share the file, so a second run within
+the TTL makes next to no API calls.
+"""
+import json
+import os
+import time
+
+from cloudinary import api
+from django.conf import settings
+
+BATCH_SIZE = 100  # resources_by_ids limit
+
+
+def public_id_from_value(value):
+    """
+    Cloudinary public id for a stored field value: "properties/name.jpg", "properties/name",
+    or a delivery URL (version and extension dropped). None if there is nothing to look up.
+    """
+    if not value:
+        return None
+    s = str(value)
+    if s.startswith("http"):
+        # extract after /upload/ and drop version if present
+        try:
+            part = s.split("/upload/")[1]
+            if part.startswith("v") and "/" in part:
+                part = "/".join(part.split("/")[1:])
+            return part.rsplit(".", 1)[0]
+        except Exception:
+            return None
+    return s.rsplit(".", 1)[0] if "." in s else s
+
+
+class ResourceCache:
+    """{key: entry} in a JSON file; entries older than `ttl` seconds are ignored."""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = str(path or settings.LISTINGS_CLOUDINARY_RESOURCE_CACHE)
+        self.ttl = settings.LISTINGS_CLOUDINARY_RESOURCE_TTL if ttl is None else ttl
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                self.entries = json.load(fh)
+        except (OSError, ValueError):
+            pass  # first run, or a damaged file: start empty
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry["checked_at"] > self.ttl:
+            return None
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = dict(entry, checked_at=time.time())
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        now = time.time()
+        live = {k: v for k, v in self.entries.items() if now - v["checked_at"] <= self.ttl}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(live, fh)
+        os.replace(tmp, self.path)  # atomic: concurrent commands never read half a file
+        self.dirty = False
+
+
+def _key(public_id, resource_type, upload_type):
+    return f"{resource_type}/{upload_type}/{public_id}"
+
+
+def record_upload(cache, asset, resource_type="image", upload_type="upload"):
+    """Remember a just uploaded (or reused) MediaAsset as present, so the next lookup() needs no API call."""
+    version = int(asset.version) if str(asset.version).isdigit() else asset.version or None
+    cache.put(_key(asset.public_id, resource_type, upload_type),
+              {"version": version, "bytes": asset.bytes, "format": asset.format})
+
+
+def lookup(public_ids, resource_type="image", upload_type="upload", cache=None):
+    """
+    {public_id: {"version", "bytes", "format"} or None if it does not exist} for every id,
+    from the cache where fresh and otherwise from batched resources_by_ids calls.
+    Returns (results, api_calls).
+    """
+    cache = cache or ResourceCache()
+    results = {}
+    unknown = []
+    for public_id in dict.fromkeys(p for p in public_ids if p):
+        entry = cache.get(_key(public_id, resource_type, upload_type))
+        if entry is None:
+            unknown.append(public_id)
+        else:
+            results[public_id] = None if entry.get("missing") else entry
+
+    calls = 0
+    try:
+        for start in range(0, len(unknown), BATCH_SIZE):
+            chunk = unknown[start:start + BATCH_SIZE]
+            response = api.resources_by_ids(chunk, resource_type=resource_type, type=upload_type,
+                                            max_results=BATCH_SIZE)
+            calls += 1
+            found = {r["public_id"]: r for r in response.get("resources", [])}
+            for public_id in chunk:
+                r = found.get(public_id)
+                entry = ({"version": r.get("version"), "bytes": r.get("bytes"), "format": r.get("format")}
+                         if r else {"missing": True})
+                cache.put(_key(public_id, resource_type, upload_type), entry)
+                results[public_id] = entry if r else None
+    finally:
+        # keep what was learned even if a later chunk fails (e.g. rate limited)
+        cache.save()
+    return results, calls
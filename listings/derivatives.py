@@ -0,0 +1,230 @@
+# listings/derivatives.py
+"""
+On-demand resized / format-converted copies of local media images, for
+deployments without Cloudinary (FileSystemStorage).
+
+URLs look like /media-derivatives/<width>/<path under MEDIA_ROOT>?v=<mtime>
+(see derivative_url). The first request for a variant renders it with Pillow
+into a cache directory; the file name is a hash of the source identity
+(path, mtime, size) and the variant parameters, so a replaced source never
+hits a stale copy and the response can be cached by browsers for a year.
+
+Only one worker renders a given variant at a time: a striped in-process lock
+plus a striped flock() on Unix. The cache directory is bounded
+(LISTINGS_DERIVATIVE_CACHE_MAX_BYTES): hits refresh a file's mtime and, after
+a write, the least recently used files are removed until it fits again, so a
+variant can disappear between get_variant() and reading it; open_variant()
+renders it again in that case.
+
+Variants are never upscaled, so srcset widths above the source's own width are
+collapsed into one candidate described by its real width (capped_widths()).
+"""
+import functools
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.urls import reverse
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; the in-process lock still applies
+    fcntl = None
+
+FORMATS = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+PIL_FORMATS = {"jpeg": "JPEG", "png": "PNG", "webp": "WEBP"}
+# widths the admin thumbnails ask for (60/80 px at 1x and 2x), on top of LISTINGS_IMAGE_WIDTHS
+THUMB_WIDTHS = (60, 80, 120, 160)
+LOCK_STRIPES = 64
+
+_stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+_evict_lock = threading.Lock()
+
+
+def cache_dir():
+    return str(settings.LISTINGS_DERIVATIVE_CACHE_DIR)
+
+
+def allowed_widths():
+    from .images import image_widths
+    return set(image_widths()) | set(THUMB_WIDTHS)
+
+
+def source_path(rel):
+    """Absolute path of `rel` under MEDIA_ROOT, or None if it escapes it or is not a file."""
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(os.path.join(root, rel))
+    if not path.startswith(root + os.sep) or path.startswith(os.path.realpath(cache_dir()) + os.sep):
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def derivative_url(rel, width):
+    """URL of the `width` px variant of the local media file `rel`, or None if it does not exist."""
+    path = source_path(rel)
+    if path is None:
+        return None
+    version = int(os.stat(path).st_mtime)
+    return f"{reverse('listings:derivative', args=[width, rel])}?v={version}"
+
+
+def source_width(rel):
+    """Displayed width (px, EXIF orientation applied) of the local media file `rel`, or None."""
+    path = source_path(rel)
+    if path is None:
+        return None
+    return _image_width(path, os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4096)
+def _image_width(path, mtime_ns):
+    # keyed on mtime too, so a replaced file is measured again; only the header is read
+    from PIL import Image
+    from .image_utils import EXIF_ORIENTATION, ROTATED_ORIENTATIONS
+
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            rotated = image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    return height if rotated else width
+
+
+def capped_widths(widths, natural):
+    """
+    [(descriptor width, requested width)] for a srcset of an image `natural` px wide.
+    Widths above it would only re-encode the image at its own size under a wrong
+    descriptor, so they collapse into one (natural, smallest such width) candidate.
+    """
+    widths = sorted(set(widths))
+    if not natural:
+        return [(w, w) for w in widths]
+    pairs = [(w, w) for w in widths if w <= natural]
+    larger = [w for w in widths if w > natural]
+    if larger:
+        pairs.append((natural, larger[0]))
+    return pairs
+
+
+def negotiate_format(requested, accept, source_ext):
+    """Output format for ?fmt=: explicit jpeg/png/webp, or 'auto' -> WebP when the browser takes it."""
+    if requested in FORMATS:
+        return requested
+    if "image/webp" in (accept or ""):
+        return "webp"
+    return "png" if source_ext == ".png" else "jpeg"
+
+
+def variant_key(path, width, fmt, quality):
+    st = os.stat(path)
+    ident = f"{path}|{st.st_mtime_ns}|{st.st_size}|{width}|{fmt}|{quality}"
+    return hashlib.sha256(ident.encode()).hexdigest()
+
+
+def variant_path(key, fmt):
+    return os.path.join(cache_dir(), key[:2], f"{key}.{fmt}")
+
+
+@contextmanager
+def _single_flight(key):
+    stripe = int(key[:8], 16) % LOCK_STRIPES
+    with _stripes[stripe]:
+        if fcntl is None:
+            yield
+            return
+        lock_dir = os.path.join(cache_dir(), ".locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(os.path.join(lock_dir, f"{stripe:02d}.lock"), "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def get_variant(path, width, fmt, quality=None):
+    """
+    Path of the cached (width, fmt) variant of the image at `path`, rendering it on a miss.
+    Returns (variant_path, key), or (None, None) if the source is not a readable image.
+    """
+    from .image_utils import make_derivative  # Pillow only needed on a miss
+
+    quality = quality or settings.LISTINGS_UPLOAD_JPEG_QUALITY
+    key = variant_key(path, width, fmt, quality)
+    out = variant_path(key, fmt)
+    if _touch(out):
+        return out, key
+
+    with _single_flight(key):
+        # another worker may have rendered it while we waited for the lock
+        if _touch(out):
+            return out, key
+        if not make_derivative(path, out, width, fmt=PIL_FORMATS[fmt], quality=quality):
+            return None, None
+
+    evict()
+    return out, key
+
+
+def open_variant(path, width, fmt, quality=None):
+    """
+    get_variant(), opened for reading: (file, key), or (None, None) if the source is not a
+    readable image. A variant evicted by another worker before it could be opened is rendered again.
+    """
+    for _ in range(2):
+        out, key = get_variant(path, width, fmt, quality)
+        if out is None:
+            return None, None
+        try:
+            return open(out, "rb"), key
+        except FileNotFoundError:
+            continue
+    return None, None
+
+
+def _touch(path):
+    """Mark a cached variant as recently used; False if it is not there."""
+    try:
+        os.utime(path)
+        return True
+    except OSError:
+        return False
+
+
+def evict(max_bytes=None):
+    """Remove least recently used variants until the cache is under its size budget."""
+    max_bytes = max_bytes or settings.LISTINGS_DERIVATIVE_CACHE_MAX_BYTES
+    if not _evict_lock.acquire(blocking=False):
+        return 0  # another thread is already evicting
+    try:
+        entries = []
+        total = 0
+        for shard in os.scandir(cache_dir()):
+            if not shard.is_dir() or shard.name.startswith("."):
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= max_bytes:
+            return 0
+        removed = 0
+        # trim to 90% so a busy cache is not rescanned on every write
+        for _, size, path in sorted(entries):
+            if total <= max_bytes * 0.9:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+    finally:
+        _evict_lock.release()
@@ -0,0 +1,59 @@
+# listings/detail.py
+"""
+Cached payload for property_detail: the property, its resolved image URLs and
+its unit options with prices already formatted.
+
+A miss costs a fixed two queries (the property, then its options via
+prefetch_related); a hit costs none. listings.signals drops the entry when
+the property or any of its options is saved or deleted.
+"""
+from django.core.cache import cache
+
+from .images import IMAGE_FIELDS
+from .models import Property
+
+DETAIL_TTL = 60 * 60 * 24
+
+
+def detail_key(slug):
+    return f"listings:detail:{slug}"
+
+
+def naira(amount):
+    return f"₦{amount:,.0f}" if amount else ""
+
+
+def build_payload(slug):
+    """Uncached payload for `slug`, or None if there is no such property."""
+    obj = Property.objects.prefetch_related("options").filter(slug=slug).first()
+    if obj is None:
+        return None
+    options = [
+        {
+            "unit_type_display": opt.get_unit_type_display(),
+            "label": opt.label,
+            "price": naira(opt.price),
+            "initial_deposit": naira(opt.initial_deposit),
+        }
+        for opt in obj.options.all()
+    ]
+    urls = obj.image_url_map()
+    return {
+        "obj": obj,
+        "images": [urls[f] for f in IMAGE_FIELDS if f in urls][:3],
+        "options": options,
+    }
+
+
+def get_payload(slug):
+    key = detail_key(slug)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_payload(slug)
+        if payload is not None:
+            cache.set(key, payload, DETAIL_TTL)
+    return payload
+
+
+def invalidate(*slugs):
+    cache.delete_many([detail_key(s) for s in slugs if s])
@@ -0,0 +1,78 @@
+# listings/facets.py
+"""
+Facet counts for the listings filter sidebar.
+
+Each facet is counted with every *other* active filter applied, so picking a
+category shows how many properties each price band has in that category (and
+vice versa). All counts come from one conditional-aggregate query, cached per
+normalized filter state and catalogue version (see listings/cache.py).
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .cache import versioned_key
+from .models import Category, Property
+
+FACET_TTL = 60 * 60
+
+# (min, max, label); both inclusive, None means open-ended. A band is linked as ?minp=min&maxp=max,
+# so its count uses the same bounds as ListingFilters.apply(): a price on an edge is in both bands
+PRICE_BUCKETS = [
+    (None, Decimal("10000000"), "Under ₦10M"),
+    (Decimal("10000000"), Decimal("25000000"), "₦10M – ₦25M"),
+    (Decimal("25000000"), Decimal("50000000"), "₦25M – ₦50M"),
+    (Decimal("50000000"), Decimal("100000000"), "₦50M – ₦100M"),
+    (Decimal("100000000"), None, "₦100M+"),
+]
+
+
+def _bucket_q(lo, hi):
+    # a property is in a band when any of its prices (min_price..max_price) falls inside it
+    q = Q(max_price__isnull=False)
+    if lo is not None:
+        q &= Q(max_price__gte=lo)
+    if hi is not None:
+        q &= Q(min_price__lte=hi)
+    return q
+
+
+def _price_q(filters):
+    q = Q()
+    if filters.minp is not None:
+        q &= Q(max_price__gte=filters.minp)
+    if filters.maxp is not None:
+        q &= Q(min_price__lte=filters.maxp)
+    return q
+
+
+def compute_facets(filters):
+    """Run the aggregate query for `filters` (a ListingFilters). Uncached."""
+    base = filters.apply(Property.objects.order_by(), ranked=False, skip=("cat", "price"))
+    price_q = _price_q(filters)
+    cat_q = Q(category=filters.cat) if filters.cat else Q()
+
+    aggregates = {}
+    for i, key in enumerate(Category.values):
+        aggregates[f"cat_{i}"] = Count("pk", filter=price_q & Q(category=key))
+    for i, (lo, hi, _label) in enumerate(PRICE_BUCKETS):
+        aggregates[f"price_{i}"] = Count("pk", filter=cat_q & _bucket_q(lo, hi))
+    counts = base.aggregate(**aggregates)
+
+    return {
+        "categories": [
+            {"key": key, "label": label, "count": counts[f"cat_{i}"]}
+            for i, (key, label) in enumerate(Category.choices)
+        ],
+        "price_buckets": [
+            {"minp": lo, "maxp": hi, "label": label, "count": counts[f"price_{i}"]}
+            for i, (lo, hi, label) in enumerate(PRICE_BUCKETS)
+        ],
+    }
+
+
+def get_facets(filters):
+    """Cached facet counts for the current filter state."""
+    key = versioned_key("facets", filters.key())
+    return cache.get_or_set(key, lambda: compute_facets(filters), FACET_TTL)
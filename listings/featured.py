@@ -0,0 +1,67 @@
+# listings/featured.py
+"""
+The featured-listings block on the home page, precomputed and cached.
+
+Cards are stored as plain dicts with their image URLs already resolved, so a
+warm home page makes no database queries and no Cloudinary URL building.
+The block has its own version key (rather than the catalogue version) so that
+edits to non-featured listings leave it alone; listings.signals bumps it when
+a featured property changes or a property is (un)featured.
+"""
+from django.core.cache import cache
+
+from .images import IMAGE_FIELDS, placeholder_url
+from .lqip import lqip_for
+from .models import Property
+
+FEATURED_LIMIT = 6
+FEATURED_TTL = 60 * 60 * 24
+VERSION_KEY = "listings:featured-version"
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def card(p):
+    """Everything home.html needs for one featured property, as a plain dict."""
+    # first non-empty image for the grid card, like the old cover/gallery1/gallery2 chain
+    urls = p.image_url_map()
+    image_field = next((f for f in IMAGE_FIELDS if f in urls), None)
+    return {
+        "pk": p.pk,
+        "title": p.title,
+        "url": p.get_absolute_url(),
+        "category": p.category,
+        "category_display": p.get_category_display(),
+        "location": p.location,
+        "price": p.price,
+        "is_featured": p.is_featured,
+        "cover_url": urls.get("cover") or placeholder_url(),
+        "image_url": urls[image_field] if image_field else placeholder_url(),
+        # blurred placeholders (data: URIs, "" if none) for {% lqip_style %}
+        "cover_lqip": lqip_for(p, "cover"),
+        "image_lqip": lqip_for(p, image_field) if image_field else "",
+    }
+
+
+def build_cards(limit=FEATURED_LIMIT):
+    qs = Property.objects.filter(is_featured=True).order_by('-created_at')[:limit]
+    return [card(p) for p in qs]
+
+
+def get_featured_cards():
+    """Cached list of featured cards (newest first)."""
+    key = f"listings:featured:v{_version()}"
+    return cache.get_or_set(key, build_cards, FEATURED_TTL)
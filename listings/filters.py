@@ -0,0 +1,61 @@
+# listings/filters.py
+"""
+The property_list filter state (q, cat, minp, maxp), parsed once per request.
+
+Normalizing here means "?q=Lekki " and "?q=lekki" share cache entries, and a
+non-numeric price is ignored instead of raising a 500.
+"""
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlencode
+
+from . import search
+from .models import Category
+
+
+def _parse_price(value):
+    try:
+        price = Decimal(str(value).replace(",", "").strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return price if price.is_finite() and price >= 0 else None
+
+
+class ListingFilters(namedtuple("ListingFilters", "q cat minp maxp")):
+    __slots__ = ()
+
+    @classmethod
+    def from_params(cls, params):
+        q = " ".join((params.get("q") or "").split())
+        cat = params.get("cat") or ""
+        return cls(
+            q=q or None,
+            cat=cat if cat in Category.values else None,
+            minp=_parse_price(params.get("minp")) if params.get("minp") else None,
+            maxp=_parse_price(params.get("maxp")) if params.get("maxp") else None,
+        )
+
+    def key(self):
+        """Stable string identifying this filter state (for cache keys)."""
+        # minp=0 still filters (rows without prices drop out), so it must not look like "no filter";
+        # normalize() makes 10 and 10.00 one key
+        prices = ["" if v is None else str(v.normalize()) for v in (self.minp, self.maxp)]
+        return "|".join([(self.q or "").lower(), self.cat or "", *prices])
+
+    def querystring(self):
+        """urlencoded active filters, for pagination and facet links."""
+        return urlencode([(k, v) for k, v in self._asdict().items() if v is not None])
+
+    def apply(self, qs, ranked=True, skip=()):
+        """Filter a Property queryset. `skip` names filters to leave out (used by facets)."""
+        if self.q and "q" not in skip:
+            qs = search.search_queryset(qs, self.q, ranked=ranked)
+        if self.cat and "cat" not in skip:
+            qs = qs.filter(category=self.cat)
+        # Price filter matches legacy Property.price or any options__price, via the
+        # denormalized bounds: some price >= minp  <=>  max_price >= minp (and vice versa)
+        if self.minp is not None and "price" not in skip:
+            qs = qs.filter(max_price__gte=self.minp)
+        if self.maxp is not None and "price" not in skip:
+            qs = qs.filter(min_price__lte=self.maxp)
+        return qs
@@ -0,0 +1,155 @@
+# listings/image_utils.py
+import os
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+
+# result of optimize_image(): re-encoded bytes plus the sizes the admin reports
+OptimizedImage = namedtuple("OptimizedImage", "stem jpeg original_size")
+
+EXIF_ORIENTATION = 0x0112
+# orientations that swap width and height once applied
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+# thumbnail(): shrink by an integer factor first (JPEG: DCT-domain draft, else reduce()), leaving
+# at most this factor for the LANCZOS pass; 2.0 is visually indistinguishable from a full resample
+REDUCING_GAP = 2.0
+
+
+def load_scaled(fp, box, reducing_gap=REDUCING_GAP):
+    """
+    Open an image (or take a freshly opened, not yet loaded one) and return it EXIF-oriented
+    and scaled down to fit `box`, decoding as little as possible. Nothing may touch the
+    pixels before thumbnail(): any earlier load, convert() or exif_transpose() forces a
+    full-resolution decode and defeats draft mode. Orientation is applied last, on the
+    small image.
+    """
+    image = fp if isinstance(fp, Image.Image) else Image.open(fp)
+    width, height = box
+    if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+        width, height = height, width
+    image.thumbnail((width, height), Image.LANCZOS, reducing_gap=reducing_gap)
+    return ImageOps.exif_transpose(image)
+
+
+def compress_image_file(uploaded_file, max_size_px=1600, quality=85, target_format="JPEG"):
+    """
+    Takes an InMemoryUploadedFile (from form/admin), resizes it preserving aspect ratio,
+    re-encodes to target_format and returns a Django ContentFile ready to save to a FileField.
+    """
+    try:
+        # resize first (draft mode + reduce), convert afterwards on the small image
+        image = load_scaled(uploaded_file, (max_size_px, max_size_px))
+    except Exception:
+        return uploaded_file  # if not an image, return original
+
+    # convert RGBA -> RGB to avoid save issues with JPEG
+    if image.mode in ("RGBA", "P"):
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format=target_format, quality=quality, optimize=True)
+    buffer.seek(0)
+
+    name = uploaded_file.name
+    # ensure extension matches format
+    if not name.lower().endswith(".jpg") and target_format.upper() == "JPEG":
+        name = name.rsplit(".", 1)[0] + ".jpg"
+
+    return ContentFile(buffer.read(), name=name)
+
+
+def make_derivative(src_path, dest_path, width, fmt=None, quality=82):
+    """
+    Write a copy of the image at src_path, scaled down to `width` px wide, to dest_path.
+    `fmt` is a Pillow format name (default: the source's). Images already narrower than
+    `width` are only re-encoded, never upscaled. Returns False if the source cannot be read.
+    """
+    try:
+        with Image.open(src_path) as source:
+            fmt = fmt or source.format or "JPEG"
+            # height is unconstrained: only the width matters for srcset candidates
+            image = load_scaled(source, (width, 1 << 16))
+            if fmt == "JPEG":
+                image = _flatten(image)
+            elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            # write to a temp file and rename, so a concurrent request never serves half a file
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest_path), suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    image.save(out, format=fmt, quality=quality, optimize=True)
+                os.replace(tmp, dest_path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+    return True
+
+
+def _flatten(image):
+    """RGB copy of `image` for JPEG: transparency composited onto white."""
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image if image.mode in ("RGB", "L") else image.convert("RGB")
+
+
+def optimize_image(uploaded_file, max_edge=None, quality=None):
+    """
+    Auto-orient, cap the long edge and re-encode an uploaded photo as JPEG.
+    WebP is left to delivery: f_auto (Cloudinary) or ?fmt=auto derivatives (local storage).
+    EXIF (camera, GPS) is dropped because it is never passed to the encoder.
+    Returns an OptimizedImage, or None if the file is not an image.
+    """
+    max_edge = max_edge or settings.LISTINGS_UPLOAD_MAX_EDGE
+    quality = quality or settings.LISTINGS_UPLOAD_JPEG_QUALITY
+
+    uploaded_file.seek(0)
+    data = uploaded_file.read()
+    try:
+        # WhatsApp/phone photos rely on the orientation tag; load_scaled applies it after shrinking
+        image = _flatten(load_scaled(BytesIO(data), (max_edge, max_edge)))
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    jpeg = BytesIO()
+    image.save(jpeg, format="JPEG", quality=quality, optimize=True, progressive=True)
+
+    stem = os.path.splitext(os.path.basename(uploaded_file.name or "image"))[0]
+    return OptimizedImage(stem, jpeg.getvalue(), len(data))
+
+
+def optimize_uploads(obj, fields):
+    """
+    Run every freshly uploaded image among `fields` of `obj` through optimize_image, in
+    parallel, and swap the JPEG in as the upload that will be stored on save.
+    Returns {field: OptimizedImage} for the fields that were replaced.
+    """
+    uploads = {f: getattr(obj, f, None) for f in fields}
+    uploads = {f: u for f, u in uploads.items() if isinstance(u, UploadedFile)}
+    if not uploads:
+        return {}
+
+    # Pillow releases the GIL while decoding/resizing/encoding, so threads do run in parallel
+    with ThreadPoolExecutor(max_workers=len(uploads)) as pool:
+        results = dict(zip(uploads, pool.map(optimize_image, uploads.values())))
+
+    optimized = {}
+    for field, result in results.items():
+        if result is None:
+            continue  # not an image: leave the original upload alone
+        # must stay an UploadedFile: that is what CloudinaryField.pre_save uploads
+        setattr(obj, field, SimpleUploadedFile(f"{result.stem}.jpg", result.jpeg, content_type="image/jpeg"))
+        optimized[field] = result
+    return optimized
+
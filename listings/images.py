@@ -0,0 +1,224 @@
+# listings/images.py
+"""
+Resolving Property image fields to URLs.
+
+resolve_image_url() holds the per-value logic that used to live in the
+cover_url template filter. Property.save() runs it once per image field and
+persists the result in Property.image_urls, so templates, views and the admin
+read ready-made URLs instead of rebuilding Cloudinary URLs on every render.
+
+responsive_attrs() turns one such URL into <img> src/srcset/sizes attributes:
+Cloudinary delivery URLs get a w_/c_fill/f_auto/q_auto transformation per
+width, local /media/ files point at the on-demand derivative view
+(listings/derivatives.py).
+
+Within a request (listings.middleware.ImageURLMemoMiddleware) resolved URLs
+are memoized per (pk, field), and srcset attributes per URL, so an image shown
+in several loops of one page is resolved once; resolve_many() fills that memo for a whole page of
+properties before rendering.
+"""
+import logging
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from .derivatives import capped_widths, derivative_url, source_width
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = ("cover", "gallery1", "gallery2")
+PLACEHOLDER_STATIC = "img/brand_1.png"
+DEFAULT_WIDTHS = (320, 480, 768, 1024, 1600)
+# https://res.cloudinary.com/<cloud>/image/upload/<rest>: transformations go after "upload/"
+CLOUDINARY_DELIVERY_RE = re.compile(r"^(https?://res\.cloudinary\.com/[^/]+/image/(?:upload|fetch)/)(.+)$")
+
+
+# {(pk, field): url} for the current request; None outside one (commands, shell)
+_url_memo = ContextVar("listings_image_url_memo", default=None)
+
+
+@contextmanager
+def url_memo():
+    """Scope a fresh URL memo to the enclosed block (one request)."""
+    token = _url_memo.set({})
+    try:
+        yield
+    finally:
+        _url_memo.reset(token)
+
+
+def current_url_memo():
+    return _url_memo.get()
+
+
+def placeholder_url():
+    memo = _url_memo.get()
+    if memo is None:
+        return static(PLACEHOLDER_STATIC)
+    url = memo.get(PLACEHOLDER_STATIC)
+    if url is None:
+        url = memo[PLACEHOLDER_STATIC] = static(PLACEHOLDER_STATIC)
+    return url
+
+
+def resolve_many(properties, fields=IMAGE_FIELDS):
+    """
+    Resolve `fields` of every property in one pass: {pk: {field: url or placeholder}}.
+    Inside a request the results also go into the memo, so cover_url is a dict lookup.
+    """
+    placeholder = placeholder_url()
+    memo = _url_memo.get()
+    resolved = {}
+    for p in properties:
+        urls = p.image_url_map()
+        row = resolved[p.pk] = {f: urls.get(f) or placeholder for f in fields}
+        if memo is not None:
+            memo.update(((p.pk, f), url) for f, url in row.items())
+    return resolved
+
+
+class ImageURLError(Exception):
+    """A non-empty image value could not be turned into a URL (e.g. Cloudinary not configured)."""
+
+
+def resolve_image_url(field, strict=False):
+    """
+    Return the URL for one image field value, or None if it is empty/unusable.
+      - CloudinaryResource -> its secure URL (or the full URL stored in the DB)
+      - URL string -> itself
+      - FieldFile with .url -> that
+    With `strict`, a value that is set but cannot be resolved raises ImageURLError instead.
+    """
+    if field is None:
+        return None
+
+    # CloudinaryField values are CloudinaryResource objects: public_id, no .name
+    public_id = getattr(field, "public_id", None)
+    if public_id is not None:
+        if not public_id:
+            return None
+        if public_id.startswith("http://") or public_id.startswith("https://"):
+            # a full URL stored in the DB; the field parser splits the extension off
+            fmt = getattr(field, "format", None)
+            return f"{public_id}.{fmt}" if fmt else public_id
+        try:
+            return str(field.build_url(secure=True))
+        except Exception as exc:
+            if strict:
+                raise ImageURLError(f"cannot build a URL for {public_id!r}: {exc}") from exc
+            return None
+
+    if isinstance(field, str):
+        s = field.strip()
+        return s if s.startswith("http://") or s.startswith("https://") else None
+
+    # FieldFile: empty when it has no name
+    try:
+        if not getattr(field, "name", None):
+            return None
+    except Exception:
+        return None
+    s = str(field)
+    if s.startswith("http://") or s.startswith("https://"):
+        return s
+    try:
+        return str(field.url)
+    except Exception as exc:
+        if strict:
+            raise ImageURLError(f"cannot build a URL for {s!r}: {exc}") from exc
+        return None
+
+
+def compute_image_urls(obj):
+    """
+    The compact dict stored in Property.image_urls: URLs of non-empty fields, plus a placeholder flag.
+    None if any field cannot be resolved in this process (e.g. a shell without Cloudinary
+    credentials): the column then stays NULL and readers resolve the fields live, rather
+    than trusting a stored placeholder.
+    """
+    try:
+        return _image_urls(obj, strict=True)
+    except ImageURLError as exc:
+        logger.warning("Not storing image URLs for %s: %s", getattr(obj, "pk", obj), exc)
+        return None
+
+
+def live_image_urls(obj):
+    """Same dict as compute_image_urls, with unresolvable fields treated as empty; for display only."""
+    return _image_urls(obj, strict=False)
+
+
+def _image_urls(obj, strict):
+    urls = {}
+    for name in IMAGE_FIELDS:
+        url = resolve_image_url(getattr(obj, name, None), strict=strict)
+        if url:
+            urls[name] = url
+    if "cover" not in urls:
+        urls["placeholder"] = True
+    return urls
+
+
+def image_widths():
+    """Widths offered in srcset, smallest first (settings.LISTINGS_IMAGE_WIDTHS)."""
+    return tuple(sorted(set(getattr(settings, "LISTINGS_IMAGE_WIDTHS", None) or DEFAULT_WIDTHS)))
+
+
+def _media_rel(url):
+    """Path under MEDIA_ROOT of a local /media/ URL, or None."""
+    media_url = settings.MEDIA_URL
+    if not media_url.startswith("/") or not url.startswith(media_url):
+        return None
+    return url[len(media_url):].split("?", 1)[0] or None
+
+
+def _local_derivative_url(url, width):
+    rel = _media_rel(url)
+    return derivative_url(rel, width) if rel else None
+
+
+def sized_url(url, width, aspect=None):
+    """
+    `url` scaled to `width` px wide (cropped to `aspect`, e.g. "4:3", on Cloudinary),
+    or None when there is no smaller copy to offer (external URL, missing local file).
+    """
+    m = CLOUDINARY_DELIVERY_RE.match(url or "")
+    if m:
+        crop = f"c_fill,w_{width}" + (f",ar_{aspect}" if aspect else "")
+        return f"{m.group(1)}{crop},f_auto,q_auto/{m.group(2)}"
+    return _local_derivative_url(url or "", width)
+
+
+def responsive_attrs(url, sizes="100vw", widths=None, aspect=None):
+    """src/srcset/sizes attributes for an <img> showing `url`; just src when it cannot be resized."""
+    url = url or placeholder_url()
+    memo = _url_memo.get()
+    key = ("srcset", url, sizes, tuple(widths or ()), aspect)
+    if memo is not None and key in memo:
+        return memo[key]
+    attrs = _responsive_attrs(url, sizes, widths, aspect)
+    if memo is not None:
+        memo[key] = attrs
+    return attrs
+
+
+def _responsive_attrs(url, sizes, widths, aspect):
+    widths = widths or image_widths()
+    rel = _media_rel(url)
+    if rel:
+        # local derivatives are never upscaled: describe each candidate by the width it really has
+        candidates = [(w, derivative_url(rel, requested))
+                      for w, requested in capped_widths(widths, source_width(rel))]
+    else:
+        candidates = [(w, sized_url(url, w, aspect)) for w in widths]
+    seen = set()
+    candidates = [(w, u) for w, u in candidates if u and not (u in seen or seen.add(u))]
+    if not candidates:
+        return format_html('src="{}"', url)
+    srcset = ", ".join(f"{u} {w}w" for w, u in candidates)
+    return format_html('src="{}" srcset="{}" sizes="{}"', candidates[-1][1], srcset, sizes)
@@ -0,0 +1,100 @@
+# listings/lqip.py
+"""
+Low-quality image placeholders (LQIP) for property images.
+
+Each cover/gallery image gets a ~24px JPEG, base64-encoded as a data: URI
+(a few hundred bytes) and stored in Property.image_lqip as
+{field: [source_url, data_uri]}. Templates paint it as the <img> background,
+so a card shows a blurred preview at once and the real image streams in on top.
+
+Sources are read as cheaply as possible: Cloudinary URLs ask the CDN for a
+24px variant (so no full-size download), local /media/ files are decoded in
+draft mode, other URLs are fetched with a size cap. placeholder_for() takes
+plain arguments so it can run in a process pool (compute_lqip command).
+"""
+import base64
+import logging
+import os
+from io import BytesIO
+
+import requests
+from django.conf import settings
+
+from .image_utils import _flatten, load_scaled
+from .images import CLOUDINARY_DELIVERY_RE, IMAGE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+LQIP_SIZE = 24
+LQIP_QUALITY = 40
+FETCH_TIMEOUT = 5
+MAX_FETCH_BYTES = 15 * 1024 * 1024
+
+
+def _encode(data):
+    image = _flatten(load_scaled(BytesIO(data), (LQIP_SIZE, LQIP_SIZE)))
+    out = BytesIO()
+    image.save(out, format="JPEG", quality=LQIP_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode("ascii")
+
+
+def _fetch(url):
+    with requests.get(url, timeout=FETCH_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        data = response.raw.read(MAX_FETCH_BYTES + 1, decode_content=True)
+    if len(data) > MAX_FETCH_BYTES:
+        raise ValueError(f"{url} is larger than {MAX_FETCH_BYTES} bytes")
+    return data
+
+
+def placeholder_for(url, media_url, media_root):
+    """data: URI placeholder for one image URL, or None if it cannot be read."""
+    try:
+        m = CLOUDINARY_DELIVERY_RE.match(url)
+        if m:
+            # let the CDN do the shrinking; re-encoding the tiny response locally is nearly free
+            # and keeps the output uniform (metadata stripped, same quality)
+            return _encode(_fetch(f"{m.group(1)}c_limit,w_{LQIP_SIZE},h_{LQIP_SIZE},f_jpg/{m.group(2)}"))
+        if media_url.startswith("/") and url.startswith(media_url):
+            path = os.path.join(media_root, url[len(media_url):].split("?", 1)[0])
+            with open(path, "rb") as fh:
+                return _encode(fh.read())
+        if url.startswith("http://") or url.startswith("https://"):
+            return _encode(_fetch(url))
+    except Exception as exc:
+        logger.warning("LQIP failed for %s: %s", url, exc)
+    return None
+
+
+def stale_fields(obj):
+    """(field, url) pairs whose stored placeholder is missing or was made from another URL."""
+    urls = obj.image_url_map()
+    stored = obj.image_lqip or {}
+    return [(f, urls[f]) for f in IMAGE_FIELDS if f in urls and (stored.get(f) or [None])[0] != urls[f]]
+
+
+def merged(obj, computed):
+    """New image_lqip value: `computed` {field: (url, data_uri)} over the stored one, minus removed images."""
+    urls = obj.image_url_map()
+    lqip = {f: v for f, v in (obj.image_lqip or {}).items() if f in urls and v[0] == urls[f]}
+    lqip.update({f: [url, data] for f, (url, data) in computed.items() if data})
+    return lqip
+
+
+def refresh(obj):
+    """Save hook: recompute placeholders for changed images of one property (no-op if none changed)."""
+    stale = stale_fields(obj)
+    current = merged(obj, {})
+    if not stale and current == (obj.image_lqip or {}):
+        return False
+    computed = {f: (url, placeholder_for(url, settings.MEDIA_URL, str(settings.MEDIA_ROOT))) for f, url in stale}
+    obj.image_lqip = merged(obj, computed)
+    type(obj).objects.filter(pk=obj.pk).update(image_lqip=obj.image_lqip)
+    return True
+
+
+def lqip_for(obj, field_name="cover"):
+    """Stored placeholder data URI for `field_name`, or "" if there is none for the current image."""
+    entry = (getattr(obj, "image_lqip", None) or {}).get(field_name)
+    urls = getattr(obj, "image_urls", None) or {}
+    return entry[1] if entry and entry[0] == urls.get(field_name) else ""
@@ -0,0 +1,104 @@
+# listings/maintenance.py
+"""
+Chunked, low-lock rewrites of Property image fields for maintenance commands
+(normalize_cloudinary_fields, upload_placeholders_to_cloudinary, sync_media).
+
+Properties are read in primary-key order, `chunk_size` at a time, without
+locks. For each chunk only the rows that need a change are then locked
+(select_for_update on their pks), re-read, and written with one bulk_update
+of just the image fields plus image_urls/updated_at, in a transaction that
+lasts as long as that chunk. Rows the command doesn't touch are never locked,
+and no lock outlives a chunk, so the site keeps serving during a run.
+
+bulk_update skips Property.save() and the post_save signal; what they would
+have maintained (image_urls, updated_at for card cache keys, the catalogue /
+featured / detail caches) is handled here. Placeholders are not:
+run `manage.py compute_lqip` afterwards. Cache invalidation only reaches the
+web server with a shared cache backend: with the default per-process LocMem
+cache it clears this process only, and the run says so
+(listings.cache.process_local_warning).
+"""
+import time
+from collections import namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import detail, featured
+from .cache import bump_catalogue_version, process_local_warning
+from .images import IMAGE_FIELDS, compute_image_urls
+from .models import Property
+
+RewriteResult = namedtuple("RewriteResult", "scanned updated seconds")
+
+
+def _load(qs):
+    return qs.order_by("pk").only("pk", "slug", "title", "image_urls", "updated_at", *IMAGE_FIELDS)
+
+
+def rewrite_images(changes, chunk_size=500, batch_size=500, dry_run=False, log=None, report=None):
+    """
+    Apply `changes(p)` -> {field_name: new_value} (empty if nothing to do) to every Property.
+    `changes` must be a pure function of the row: it runs once on the unlocked read (and
+    is what dry runs report) and again on the locked re-read, which is what gets written.
+    `report(p, new_values)` is called for every row on the unlocked read (per-row output);
+    `log(message)` receives one timing line per chunk. Returns RewriteResult.
+    """
+    log = log or (lambda message: None)
+    fields = {name: Property._meta.get_field(name) for name in IMAGE_FIELDS}
+    start = time.perf_counter()
+    scanned = updated = 0
+    slugs = []
+    last_pk = 0
+    while True:
+        chunk_start = time.perf_counter()
+        chunk = list(_load(Property.objects.filter(pk__gt=last_pk))[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        scanned += len(chunk)
+        candidates = []
+        for p in chunk:
+            new_values = changes(p)
+            if report is not None:
+                report(p, new_values)
+            if new_values:
+                candidates.append(p.pk)
+        if dry_run or not candidates:
+            log(f"Chunk up to pk {last_pk}: {len(candidates)} of {len(chunk)} to change "
+                f"({time.perf_counter() - chunk_start:.2f}s).")
+            updated += len(candidates)
+            continue
+
+        with transaction.atomic():
+            # lock only the rows being changed, and re-read them: they may have been edited since
+            rows = list(_load(Property.objects.select_for_update().filter(pk__in=candidates)))
+            now = timezone.now()
+            changed = []
+            touched_fields = set()
+            for p in rows:
+                new_values = changes(p)
+                if not new_values:
+                    continue
+                for name, value in new_values.items():
+                    setattr(p, name, fields[name].to_python(value))
+                touched_fields.update(new_values)
+                p.image_urls = compute_image_urls(p)
+                p.updated_at = now  # new card cache keys (listings/cards.py)
+                changed.append(p)
+            if changed:
+                Property.objects.bulk_update(
+                    changed, [*sorted(touched_fields), "image_urls", "updated_at"], batch_size=batch_size)
+        updated += len(changed)
+        slugs.extend(p.slug for p in changed)
+        log(f"Chunk up to pk {last_pk}: updated {len(changed)} of {len(chunk)} "
+            f"({time.perf_counter() - chunk_start:.2f}s, locked {len(candidates)} rows).")
+
+    if slugs:
+        bump_catalogue_version()
+        featured.invalidate()
+        detail.invalidate(*slugs)
+        note = process_local_warning()
+        if note:
+            log(note)
+    return RewriteResult(scanned, updated, time.perf_counter() - start)
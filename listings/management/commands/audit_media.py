@@ -2,6 +2,7 @@
 import os
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from listings import cloud_resources
 from listings.models import Property
 
 FIELDS = ['cover', 'gallery1', 'gallery2']
@@ -9,6 +10,10 @@ FIELDS = ['cover', 'gallery1', 'gallery2']
 class Command(BaseCommand):
     help = "Audit Property media fields: local existence, http URLs, empty."
 
+    def add_arguments(self, parser):
+        parser.add_argument("--check-cloud", action="store_true",
+                            help="Also check that Cloudinary URLs/public ids exist (batched API calls, cached locally).")
+
     def handle(self, *args, **kwargs):
         qs = Property.objects.all()
         total = qs.count()
@@ -17,6 +22,7 @@ class Command(BaseCommand):
         http_fields = []
         present_local = []
         empty = []
+        public_ids = {}
 
         for p in qs:
             for f in FIELDS:
@@ -36,6 +42,7 @@ class Command(BaseCommand):
                             local_path = val.path
                         except Exception:
                             local_path = None
+                    public_ids[p.id, f] = getattr(val, 'public_id', None) or cloud_resources.public_id_from_value(s)
                     if not local_path:
                         candidate = os.path.join(settings.MEDIA_ROOT, s.lstrip('/'))
                         local_path = candidate
@@ -44,11 +51,27 @@ class Command(BaseCommand):
                     else:
                         missing_local.append((p.id, p.title, f, local_path or s))
 
+        on_cloud = []
+        missing_cloud = []
+        if kwargs["check_cloud"]:
+            # values not found on disk may be Cloudinary public ids (CloudinaryField): check those too
+            candidates = [(m, cloud_resources.public_id_from_value(m[3])) for m in http_fields if "res.cloudinary.com" in m[3]]
+            candidates += [(m, public_ids[m[0], m[2]]) for m in missing_local]
+            results, calls = cloud_resources.lookup(pid for _, pid in candidates)
+            for m, pid in candidates:
+                (on_cloud if results.get(pid) else missing_cloud).append(m)
+            verified = set(on_cloud)
+            missing_local = [m for m in missing_local if m not in verified]
+            print(f"Checked {len(results)} public ids on Cloudinary with {calls} API call(s).")
+
         print("=== SUMMARY ===")
         print("Empty fields:", len(empty))
         print("Fields already HTTP/URL:", len(http_fields))
         print("Present locally:", len(present_local))
         print("Missing locally:", len(missing_local))
+        if kwargs["check_cloud"]:
+            print("On Cloudinary (verified):", len(on_cloud))
+            print("Missing on Cloudinary:", len(missing_cloud))
         if missing_local:
             print("\nMissing examples (id, title, field, path):")
             for m in missing_local[:20]:
@@ -57,4 +80,8 @@ class Command(BaseCommand):
             print("\nHTTP field examples (id, title, field, url):")
             for m in http_fields[:20]:
                 print(m)
+        if missing_cloud:
+            print("\nMissing on Cloudinary examples (id, title, field, value):")
+            for m in missing_cloud[:20]:
+                print(m)
         print("Done.")
@@ -0,0 +1,44 @@
+# listings/management/commands/backfill_image_urls.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from listings.images import IMAGE_FIELDS, compute_image_urls
+from listings.models import Property
+
+
+class Command(BaseCommand):
+    help = ("Recompute Property.image_urls (resolved cover/gallery URLs) from the image fields. "
+            "Run after adding the column, or after raw SQL edits that bypass Property.save().")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk UPDATE (default: 500).")
+        parser.add_argument("--only-missing", action="store_true", help="Only rows whose image_urls is still NULL.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry = options["dry_run"]
+
+        qs = Property.objects.order_by("pk").only("pk", "image_urls", *IMAGE_FIELDS)
+        if options["only_missing"]:
+            qs = qs.filter(image_urls__isnull=True)
+
+        scanned = 0
+        changed = []
+        for p in qs.iterator(chunk_size=2000):
+            scanned += 1
+            urls = compute_image_urls(p)
+            if urls != p.image_urls:
+                p.image_urls = urls
+                changed.append(p)
+
+        self.stdout.write(f"Scanned {scanned} properties; {len(changed)} need updating.")
+        if dry:
+            self.stdout.write("Dry-run complete. No DB changes made.")
+            return
+
+        # bulk_update skips save() and signals; cached pages expire with the catalogue version on next edit
+        for start in range(0, len(changed), batch_size):
+            with transaction.atomic():
+                Property.objects.bulk_update(changed[start:start + batch_size], ["image_urls"])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Updated {len(changed)} properties."))
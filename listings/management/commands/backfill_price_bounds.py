@@ -0,0 +1,42 @@
+# listings/management/commands/backfill_price_bounds.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from listings.models import Property
+
+
+class Command(BaseCommand):
+    help = ("Recompute Property.min_price / max_price from Property.price and every UnitOption.price. "
+            "Run after bulk imports or raw SQL edits that bypass the save/delete signals.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk UPDATE (default: 500).")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry = options["dry_run"]
+
+        qs = (Property.objects.order_by("pk")
+              .annotate(opt_min=Min("options__price"), opt_max=Max("options__price"))
+              .only("pk", "price", "min_price", "max_price"))
+
+        scanned = 0
+        changed = []
+        for p in qs.iterator(chunk_size=2000):
+            scanned += 1
+            lo, hi = Property.price_bounds(p.price, (p.opt_min, p.opt_max))
+            if (lo, hi) != (p.min_price, p.max_price):
+                p.min_price, p.max_price = lo, hi
+                changed.append(p)
+
+        self.stdout.write(f"Scanned {scanned} properties; {len(changed)} need updating.")
+        if dry:
+            self.stdout.write("Dry-run complete. No DB changes made.")
+            return
+
+        for start in range(0, len(changed), batch_size):
+            with transaction.atomic():
+                Property.objects.bulk_update(changed[start:start + batch_size], ["min_price", "max_price"])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Updated {len(changed)} properties."))
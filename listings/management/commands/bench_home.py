@@ -0,0 +1,45 @@
+# listings/management/commands/bench_home.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from listings import featured
+from listings.views import home
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the home() view with the featured-listings cache cold (every request "
+            "rebuilds the block, as before caching) and warm. Reports requests/s and queries/request.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="Requests per run (default: 300).")
+
+    def handle(self, *args, **options):
+        n = max(1, options["requests"])
+        factory = RequestFactory()
+        # bypass the anonymous full-page cache so the view body itself is measured
+        view = getattr(home, "__wrapped__", home)
+
+        def run(invalidate_each_time):
+            featured.invalidate()
+            view(factory.get("/"))  # warm templates / first cache fill
+            queries = 0
+            start = time.perf_counter()
+            for _ in range(n):
+                if invalidate_each_time:
+                    featured.invalidate()
+                with CaptureQueriesContext(connection) as ctx:
+                    response = view(factory.get("/"))
+                queries += len(ctx.captured_queries)
+                assert response.status_code == 200
+            elapsed = time.perf_counter() - start
+            return n / elapsed, queries / n
+
+        cold_rps, cold_q = run(invalidate_each_time=True)
+        warm_rps, warm_q = run(invalidate_each_time=False)
+
+        self.stdout.write(f"{'':<24} {'req/s':>10} {'queries/req':>12}")
+        self.stdout.write(f"{'cold (no featured cache)':<24} {cold_rps:>10.1f} {cold_q:>12.1f}")
+        self.stdout.write(f"{'warm featured cache':<24} {warm_rps:>10.1f} {warm_q:>12.1f}")
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {warm_rps / cold_rps:.2f}x"))
@@ -0,0 +1,94 @@
+# listings/management/commands/bench_thumbnails.py
+import json
+import resource
+import subprocess
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageOps
+from listings.image_utils import load_scaled
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def full_decode(path, box):
+    """The previous path: decode at full size, orient, then resample once."""
+    image = Image.open(path)
+    image.load()
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(box, Image.LANCZOS, reducing_gap=None)
+    return image
+
+
+def draft_reduce(path, box):
+    """The current path (listings.image_utils.load_scaled): draft/reduce, resample, orient."""
+    return load_scaled(path, box)
+
+
+PATHS = {"full-decode": full_decode, "draft+reduce": draft_reduce}
+
+
+class Command(BaseCommand):
+    help = ("Benchmark thumbnailing over media/properties/: ms per image and peak RSS for the old "
+            "full-decode path and the draft+reduce path. Each path runs in its own process so peak RSS "
+            "is not shared.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=None, help="Image directory (default: MEDIA_ROOT/properties).")
+        parser.add_argument("--size", type=int, default=480, help="Long edge of the thumbnail in px (default: 480).")
+        parser.add_argument("--repeat", type=int, default=3, help="Passes over the directory (default: 3).")
+        parser.add_argument("--worker", choices=sorted(PATHS), help=("Internal: run one path in this process "
+                                                                     "and print JSON."))
+
+    def handle(self, *args, **options):
+        directory = Path(options["dir"] or Path(settings.MEDIA_ROOT) / "properties")
+        files = sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES) if directory.is_dir() else []
+        if not files:
+            raise CommandError(f"No images found in {directory}")
+        box = (options["size"], options["size"])
+        repeat = max(1, options["repeat"])
+
+        if options["worker"]:
+            self.stdout.write(json.dumps(self._run(PATHS[options["worker"]], files, box, repeat)))
+            return
+
+        self.stdout.write(f"{len(files)} images in {directory}, thumbnail box {box[0]}px, {repeat} passes")
+        self.stdout.write(f"{'path':<14} {'ms/image':>10} {'peak RSS MB':>12} {'output KB':>10}")
+        results = {}
+        for name in PATHS:
+            cmd = [sys.executable, sys.argv[0], "bench_thumbnails", "--worker", name, "--dir", str(directory),
+                   "--size", str(options["size"]), "--repeat", str(repeat)]
+            proc = subprocess.run(cmd, capture_output=True, text=True, cwd=settings.BASE_DIR)
+            if proc.returncode:
+                raise CommandError(f"{name} worker failed:\n{proc.stderr}")
+            results[name] = r = json.loads(proc.stdout.strip().splitlines()[-1])
+            self.stdout.write(f"{name:<14} {r['ms_per_image']:>10.1f} {r['peak_rss_mb']:>12.1f} {r['output_kb']:>10.1f}")
+
+        old, new = results["full-decode"], results["draft+reduce"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Speedup: {old['ms_per_image'] / new['ms_per_image']:.2f}x, "
+            f"peak RSS {old['peak_rss_mb'] - new['peak_rss_mb']:+.1f} MB saved"
+        ))
+
+    def _run(self, fn, files, box, repeat):
+        out_bytes = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for path in files:
+                image = fn(path, box)
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                buffer = BytesIO()
+                image.save(buffer, format="JPEG", quality=82)
+                out_bytes += buffer.tell()
+        elapsed = time.perf_counter() - start
+        count = repeat * len(files)
+        return {
+            "ms_per_image": elapsed * 1000 / count,
+            # ru_maxrss is KiB on Linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "output_kb": out_bytes / 1024 / count,
+        }
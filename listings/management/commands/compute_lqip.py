@@ -0,0 +1,82 @@
+# listings/management/commands/compute_lqip.py
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from listings import detail, featured, lqip
+from listings.cache import bump_catalogue_version, process_local_warning
+from listings.images import IMAGE_FIELDS
+from listings.models import Property
+
+
+class Command(BaseCommand):
+    help = ("Precompute Property.image_lqip, the blurred ~24px placeholders shown while cover/gallery "
+            "images load. Images are fetched and encoded in a process pool. Only missing/changed images are "
+            "done, so run it periodically (e.g. cron) to pick up admin edits, unless "
+            "LISTINGS_LQIP_ON_SAVE computes them on save; --all rebuilds everything.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every image, not only missing/changed ones.")
+        parser.add_argument("--workers", type=int, default=8, help="Worker processes (default: 8).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk UPDATE (default: 500).")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be computed without writing.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        properties = {}
+        jobs = []
+        qs = Property.objects.order_by("pk").only("pk", "slug", "image_urls", "image_lqip", *IMAGE_FIELDS)
+        for p in qs.iterator(chunk_size=2000):
+            if options["all"]:
+                urls = p.image_url_map()
+                stale = [(f, urls[f]) for f in IMAGE_FIELDS if f in urls]
+            else:
+                stale = lqip.stale_fields(p)
+            if stale or lqip.merged(p, {}) != (p.image_lqip or {}):
+                properties[p.pk] = p
+                jobs.extend((p.pk, f, url) for f, url in stale)
+
+        self.stdout.write(f"{len(jobs)} images on {len(properties)} properties need a placeholder.")
+        if options["dry_run"]:
+            self.stdout.write("Dry-run complete. No DB changes made.")
+            return
+
+        computed = {}
+        failed = 0
+        if jobs:
+            workers = max(1, options["workers"])
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(lqip.placeholder_for, [url for _, _, url in jobs],
+                                   repeat(settings.MEDIA_URL), repeat(str(settings.MEDIA_ROOT)),
+                                   chunksize=max(1, len(jobs) // (workers * 4)))
+                for (pk, field, url), data in zip(jobs, results):
+                    failed += data is None
+                    computed.setdefault(pk, {})[field] = (url, data)
+        self.stdout.write(f"Computed in {time.perf_counter() - start:.2f}s; {failed} failed (see warnings).")
+
+        now = timezone.now()
+        changed = []
+        for pk, p in properties.items():
+            p.image_lqip = lqip.merged(p, computed.get(pk, {}))
+            p.updated_at = now  # new card cache keys (listings/cards.py)
+            changed.append(p)
+
+        # bulk_update skips save() and signals, so drop the cached pages explicitly below
+        batch_size = options["batch_size"]
+        for offset in range(0, len(changed), batch_size):
+            with transaction.atomic():
+                Property.objects.bulk_update(changed[offset:offset + batch_size], ["image_lqip", "updated_at"])
+        if changed:
+            bump_catalogue_version()
+            featured.invalidate()
+            detail.invalidate(*(p.slug for p in changed))
+            note = process_local_warning()
+            if note:
+                self.stdout.write(self.style.WARNING(note))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. Updated {len(changed)} properties in {time.perf_counter() - start:.2f}s."))
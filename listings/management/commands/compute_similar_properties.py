@@ -0,0 +1,50 @@
+# listings/management/commands/compute_similar_properties.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from listings import similar
+from listings.cache import bump_catalogue_version, process_local_warning
+from listings.models import SimilarProperty
+
+
+class Command(BaseCommand):
+    help = ("Precompute the 'similar listings' shown on property pages: score every property against "
+            "the whole catalogue (NumPy) and store each one's top-k in SimilarProperty. "
+            "Run after imports and periodically (e.g. nightly); new listings have no block until then.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=similar.TOP_K, help=f"Neighbours per property (default: {similar.TOP_K}).")
+        parser.add_argument("--block-size", type=int, default=256,
+                            help="Properties scored per NumPy block; memory is ~4 bytes x block x catalogue (default: 256).")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk INSERT (default: 2000).")
+        parser.add_argument("--dry-run", action="store_true", help="Score and report, without writing.")
+
+    def handle(self, *args, **options):
+        if similar.np is None:
+            raise CommandError("NumPy is required for this command: pip install numpy")
+
+        start = time.perf_counter()
+        ids, features = similar.load_features()
+        self.stdout.write(f"Loaded {len(ids)} properties in {time.perf_counter() - start:.2f}s.")
+
+        start = time.perf_counter()
+        links = [
+            SimilarProperty(property_id=pk, similar_id=other, rank=rank, score=score)
+            for pk, neighbours in similar.compute_neighbours(ids, features, options["top_k"], max(1, options["block_size"]))
+            for rank, (other, score) in enumerate(neighbours, start=1)
+        ]
+        self.stdout.write(f"Scored in {time.perf_counter() - start:.2f}s; {len(links)} links.")
+        if options["dry_run"]:
+            self.stdout.write("Dry-run complete. No DB changes made.")
+            return
+
+        start = time.perf_counter()
+        # swap the whole table at once, so readers never see a half-built ranking
+        with transaction.atomic():
+            SimilarProperty.objects.all().delete()
+            SimilarProperty.objects.bulk_create(links, batch_size=options["batch_size"])
+        bump_catalogue_version()
+        note = process_local_warning()
+        if note:
+            self.stdout.write(self.style.WARNING(note))
+        self.stdout.write(self.style.SUCCESS(f"Done. Wrote {len(links)} links in {time.perf_counter() - start:.2f}s."))
@@ -0,0 +1,61 @@
+# listings/management/commands/explain_listing_queries.py
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max, Min
+from django.utils import timezone
+from listings.filters import ListingFilters
+from listings.models import Property, UnitOption
+
+
+class Command(BaseCommand):
+    help = ("Print the database EXPLAIN plan for each query the listing views run, "
+            "to check the composite/partial indexes are actually used (SQLite and Postgres).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--analyze", action="store_true", help="Postgres only: EXPLAIN ANALYZE (runs the queries).")
+        parser.add_argument("--category", default="2BR", help="Category used for the ?cat= query (default: 2BR).")
+
+    def handle(self, *args, **options):
+        analyze = options["analyze"] and connection.vendor == "postgresql"
+        sample = Property.objects.order_by("-created_at").first()
+        slug = sample.slug if sample else "example"
+        pivot = sample.created_at if sample else timezone.now()
+        pivot_id = sample.pk if sample else 0
+
+        queries = [
+            ("home(): featured listings",
+             Property.objects.filter(is_featured=True).order_by("-created_at")[:6]),
+            ("property_list: default page",
+             Property.objects.order_by("-created_at")[:9]),
+            ("property_list: ?cat=",
+             ListingFilters(q=None, cat=options["category"], minp=None, maxp=None)
+             .apply(Property.objects.order_by("-created_at"))[:9]),
+            ("property_list: ?minp=&maxp=",
+             ListingFilters(q=None, cat=None, minp=5_000_000, maxp=50_000_000)
+             .apply(Property.objects.order_by("-created_at"))[:9]),
+            ("property_list: ?q=",
+             ListingFilters(q="lekki", cat=None, minp=None, maxp=None)
+             .apply(Property.objects.order_by("-created_at"))[:9]),
+            ("property_list: keyset page (?cursor=)",
+             Property.objects.filter(created_at__lt=pivot).order_by("-created_at", "-id")[:10]),
+            ("property_detail: by slug",
+             Property.objects.filter(slug=slug)),
+            ("property_detail: unit options",
+             UnitOption.objects.filter(property_id=pivot_id)),
+            ("signals: price bounds refresh",
+             Property.objects.filter(pk=pivot_id)
+             .annotate(opt_min=Min("options__price"), opt_max=Max("options__price"))
+             .values("price", "opt_min", "opt_max")),
+        ]
+
+        self.stdout.write(f"Database vendor: {connection.vendor}\n")
+        for label, qs in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {label}"))
+            self.stdout.write(str(qs.query))
+            try:
+                plan = qs.explain(analyze=True) if analyze else qs.explain()
+            except Exception as exc:
+                self.stderr.write(f"  EXPLAIN failed: {exc}")
+                continue
+            self.stdout.write(plan)
+            self.stdout.write("")
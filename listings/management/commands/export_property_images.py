@@ -1,6 +1,7 @@
 # listings/management/commands/export_property_images.py
 import csv
 from django.core.management.base import BaseCommand
+from listings import cloud_resources
 from listings.models import Property
 
 PLACEHOLDER_FILENAME = "placeholder_600x400.png"  # adjust if you used a different name
@@ -37,6 +38,12 @@ class Command(BaseCommand):
             action="store_true",
             help="Only include properties with missing/local/non-Cloudinary image URLs",
         )
+        parser.add_argument(
+            "--check-cloud",
+            action="store_true",
+            help="Also treat Cloudinary URLs whose asset no longer exists as missing "
+                 "(batched API calls, cached locally)",
+        )
 
     def handle(self, *args, **options):
         out_path = options["out"]
@@ -50,9 +57,22 @@ class Command(BaseCommand):
             writer.writerow(["id", "title", "cover_url", "gallery1_url", "gallery2_url", "any_missing_or_local"])
 
             qs = Property.objects.all().order_by("id")
-            for p in qs:
-                urls = [get_url(getattr(p, f, None)) for f in fields]
-                any_problem = any(looks_missing_or_local(u) for u in urls)
+            rows = [(p, [get_url(getattr(p, f, None)) for f in fields]) for p in qs]
+
+            on_cloud = None
+            if options["check_cloud"]:
+                # one resources_by_ids call per 100 ids, and none for ids checked recently
+                on_cloud, calls = cloud_resources.lookup(
+                    cloud_resources.public_id_from_value(u) for _, urls in rows for u in urls if not looks_missing_or_local(u)
+                )
+                self.stdout.write(f"Checked {len(on_cloud)} public ids on Cloudinary with {calls} API call(s).")
+
+            for p, urls in rows:
+                any_problem = any(
+                    looks_missing_or_local(u)
+                    or (on_cloud is not None and not on_cloud.get(cloud_resources.public_id_from_value(u)))
+                    for u in urls
+                )
 
                 if only_missing and not any_problem:
                     continue
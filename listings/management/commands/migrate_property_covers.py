@@ -3,16 +3,20 @@ from pathlib import Path
 import os
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from listings import media_index, uploads
 from listings.models import Property
-import cloudinary.uploader
 
 class Command(BaseCommand):
-    help = "Upload local Property.cover files to Cloudinary and save secure URLs. Use --dry-run first."
+    help = ("Upload local Property.cover files to Cloudinary and point the covers at the uploaded assets. Use --dry-run first. "
+            "Uploads run concurrently and are journalled, so an interrupted run resumes where it stopped.")
 
     def add_arguments(self, parser):
         parser.add_argument("--dry-run", action="store_true", help="Show what would be done without uploading.")
         parser.add_argument("--limit", type=int, default=0, help="Process at most N properties (0 = all).")
         parser.add_argument("--folder", type=str, default="properties", help="Cloudinary folder to upload to.")
+        parser.add_argument("--perceptual", action="store_true",
+                            help="Also reuse assets for near-identical images (dHash), not just identical bytes.")
+        uploads.add_arguments(parser)
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
@@ -32,9 +36,9 @@ class Command(BaseCommand):
             qs = qs[:limit]
 
         count = 0
-        uploaded = 0
         skipped = 0
         missing_files = 0
+        jobs = []
 
         for p in qs:
             count += 1
@@ -68,42 +72,41 @@ class Command(BaseCommand):
                 continue
 
             self.stdout.write(f"[OK] {p.pk} will upload: {local_path} -> /{folder}/ (dry_run={dry_run})")
-
-            if dry_run:
-                continue
-
-            # Do the upload
-            try:
-                res = cloudinary.uploader.upload(
-                    str(local_path),
-                    folder=folder,
-                    use_filename=True,
-                    unique_filename=True,
-                    overwrite=False,
-                )
-            except Exception as exc:
-                self.stderr.write(f"[ERROR] Upload failed for {p.pk} {local_path}: {exc}")
-                continue
-
-            # Use secure_url returned by Cloudinary
-            secure_url = res.get("secure_url") or res.get("url")
-            public_id = res.get("public_id")
-
-            if not secure_url:
-                self.stderr.write(f"[ERROR] No secure_url returned for {p.pk}: {res!r}")
-                continue
-
-            # Save the URL as the field value — this works with CloudinaryField & CloudinaryStorage.
-            # If your Cloudinary field expects a public_id instead, adjust accordingly.
-            try:
-                # assign string URL; depending on your field type you may prefer p.cover.name = public_id
-                p.cover = secure_url
-                p.save(update_fields=["cover"])
-                uploaded += 1
-                self.stdout.write(f"[UPLOADED] {p.pk} -> {secure_url} (public_id={public_id})")
-            except Exception as exc:
-                self.stderr.write(f"[ERROR] saving model for {p.pk}: {exc}")
+            jobs.append(uploads.UploadJob(
+                key=f"{p.pk}:cover:{cover_name}",
+                source=str(local_path),
+                options={"folder": folder, "use_filename": True, "unique_filename": True, "overwrite": False},
+                payload=p,
+            ))
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(
+                f"Dry run. Scanned: {count}. Would upload: {len(jobs)}. Skipped: {skipped}. Missing files: {missing_files}."
+            ))
+            return
+
+        cover_field = Property._meta.get_field("cover")
+
+        def apply(result):
+            # Store the asset as a CloudinaryResource (public_id, format and version), like sync_media;
+            # Property.save() recomputes image_urls and bumps updated_at for these update_fields
+            p = result.job.payload
+            p.cover = media_index.resource(result.asset, resource_type=cover_field.resource_type,
+                                           upload_type=cover_field.type)
+            p.save(update_fields=["cover"])
+
+        journal = uploads.open_journal("migrate_property_covers", options["journal"], options["restart"])
+        try:
+            # uploads (or reuse of the asset already stored for the same content) run in a
+            # thread pool; each model is saved here as its upload completes
+            stats = uploads.run(
+                jobs, apply, journal=journal,
+                workers=options["workers"], rate=options["rate"], retries=options["retries"],
+                perceptual=options["perceptual"] or None, log=self.stdout.write,
+            )
+        finally:
+            journal.close()
 
         self.stdout.write(self.style.SUCCESS(
-            f"Done. Scanned: {count}. Uploaded: {uploaded}. Skipped: {skipped}. Missing files: {missing_files}."
+            f"Done. Scanned: {count}. Skipped: {skipped}. Missing files: {missing_files}. {stats.summary()}."
         ))
@@ -1,33 +1,16 @@
-import os
+# listings/management/commands/migrate_to_cloudinary.py
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from cloudinary.uploader import upload
-from listings.models import Property
 
-class Command(BaseCommand):
-    help = 'Upload existing Property images to Cloudinary'
 
-    def handle(self, *args, **kwargs):
-        properties = Property.objects.all()
-        total = properties.count()
-        self.stdout.write(f"Found {total} properties. Starting migration...")
+class Command(BaseCommand):
+    help = "Deprecated: use `manage.py sync_media`. Kept as an alias; uploads local Property images to Cloudinary."
 
-        for index, prop in enumerate(properties, start=1):
-            updated = False
-            for field_name in ['cover', 'gallery1', 'gallery2']:
-                field = getattr(prop, field_name)
-                if field and not str(field).startswith('http'):
-                    local_path = str(field.path) if hasattr(field, 'path') else str(field)
-                    if os.path.exists(local_path):
-                        try:
-                            result = upload(local_path, folder="properties")
-                            setattr(prop, field_name, result['secure_url'])  # or result['public_id'] if preferred
-                            updated = True
-                            self.stdout.write(f"[{index}/{total}] Uploaded {field_name} for {prop.title}")
-                        except Exception as e:
-                            self.stdout.write(f"[{index}/{total}] Failed to upload {field_name} for {prop.title}: {e}")
-                    else:
-                        self.stdout.write(f"[{index}/{total}] File not found for {field_name} on {prop.title}: {local_path}")
-            if updated:
-                prop.save()
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be done without uploading.")
 
-        self.stdout.write("Migration completed!")
+    def handle(self, *args, **options):
+        self.stderr.write(self.style.WARNING(
+            "migrate_to_cloudinary is deprecated and now runs `manage.py sync_media`, which uploads only new or changed files and stores the assets on the image fields."
+        ))
+        call_command("sync_media", dry_run=options["dry_run"], stdout=self.stdout, stderr=self.stderr)
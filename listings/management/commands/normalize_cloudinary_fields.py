@@ -2,7 +2,7 @@
 import re
 from urllib.parse import urlparse
 from django.core.management.base import BaseCommand
-from listings.models import Property
+from listings.maintenance import rewrite_images
 
 def public_id_from_url(url):
     """
@@ -44,47 +44,47 @@ class Command(BaseCommand):
             action="store_true",
             help="Actually write changes to DB. Without --apply the command runs in dry-run mode and prints what would change.",
         )
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Properties read (and at most locked) per chunk/transaction (default: 500).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per UPDATE statement (default: 500).")
 
     def handle(self, *args, **options):
         apply_changes = options["apply"]
         fields = ["cover", "gallery1", "gallery2"]
-        props = Property.objects.all()
-        total = props.count()
-        self.stdout.write(f"Found {total} properties. Scanning... (apply={apply_changes})")
+        self.stdout.write(f"Scanning properties in chunks of {options['chunk_size']}... (apply={apply_changes})")
 
-        changes = []
-        for p in props:
+        def changes(p):
+            # pure: runs on the unlocked scan and again on the locked re-read (listings/maintenance.py)
+            new_values = {}
             for f in fields:
                 val = getattr(p, f)
                 sval = str(val) if val else ""
                 if sval.startswith("http"):
                     public = public_id_from_url(sval)
-                    if not public:
-                        self.stdout.write(f"[WARN] Could not extract public_id for Property {p.id} {p.title} ({f}): {sval}")
-                        continue
-                    # if value already equal to extracted part, skip
-                    if sval.endswith(public):
-                        # candidate public extracted
-                        self.stdout.write(f"[OK ] Property {p.id} {p.title} ({f}) -> would replace URL with '{public}'")
-                        if apply_changes:
-                            setattr(p, f, public)
-                            # mark changed, but save once per object later
-                            changes.append(p)
-                    else:
-                        self.stdout.write(f"[NOTE] Property {p.id} {p.title} ({f}) extracted '{public}' from '{sval}'")
-                        if apply_changes:
-                            setattr(p, f, public)
-                            changes.append(p)
+                    if public:
+                        new_values[f] = public
+            return new_values
 
-        if apply_changes:
-            # remove duplicates and save
-            saved_ids = set()
-            for p in changes:
-                if p.id in saved_ids:
+        def report(p, new_values):
+            for f in fields:
+                val = getattr(p, f)
+                sval = str(val) if val else ""
+                if not sval.startswith("http"):
                     continue
-                p.save()
-                saved_ids.add(p.id)
-                self.stdout.write(f"[SAVED] Property {p.id} {p.title} saved.")
-            self.stdout.write(f"Done. Updated {len(saved_ids)} properties.")
+                public = new_values.get(f)
+                if not public:
+                    self.stdout.write(f"[WARN] Could not extract public_id for Property {p.id} {p.title} ({f}): {sval}")
+                # if value already equal to extracted part, skip
+                elif sval.endswith(public):
+                    self.stdout.write(f"[OK ] Property {p.id} {p.title} ({f}) -> would replace URL with '{public}'")
+                else:
+                    self.stdout.write(f"[NOTE] Property {p.id} {p.title} ({f}) extracted '{public}' from '{sval}'")
+
+        result = rewrite_images(changes, chunk_size=options["chunk_size"], batch_size=options["batch_size"],
+                                dry_run=not apply_changes, log=self.stdout.write, report=report)
+
+        if apply_changes:
+            self.stdout.write(f"Done. Updated {result.updated} of {result.scanned} properties in {result.seconds:.2f}s.")
         else:
-            self.stdout.write("Dry-run complete. No DB changes made. Re-run with --apply to write changes.")
+            self.stdout.write(f"Dry-run complete: {result.updated} of {result.scanned} properties would change "
+                              f"({result.seconds:.2f}s). No DB changes made. Re-run with --apply to write changes.")
@@ -0,0 +1,203 @@
+# listings/management/commands/sync_media.py
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from listings import maintenance, media_index, uploads
+from listings.images import IMAGE_FIELDS
+from listings.models import MediaAsset, MediaFile, Property
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+# WebP renditions older admin uploads left next to local media, not source images
+EXCLUDE_DIRS = {"webp"}
+
+
+def walk(root, rel_dir):
+    """Yield (relative path, stat) for every image under MEDIA_ROOT/rel_dir; one scandir per directory."""
+    stack = [rel_dir.strip("/")]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(os.path.join(root, current)))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            rel = f"{current}/{entry.name}" if current else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in EXCLUDE_DIRS:
+                    stack.append(rel)
+            elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                yield rel, entry.stat()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()  # same as media_index.sha256_of(<bytes>)
+
+
+def local_name(value):
+    """MEDIA_ROOT-relative path a field value still points at, or None if it is a Cloudinary asset / empty."""
+    if not value or getattr(value, "version", None):
+        return None  # uploaded assets always carry a version
+    public_id = getattr(value, "public_id", None)
+    if public_id is None:
+        name = str(value)
+    else:
+        name = f"{public_id}.{value.format}" if getattr(value, "format", None) else public_id
+    if name.startswith("http"):
+        return None
+    media_url = settings.MEDIA_URL or "/media/"
+    if name.startswith(media_url):
+        name = name[len(media_url):]
+    return name.lstrip("/")
+
+
+class Command(BaseCommand):
+    help = ("Incrementally sync local media (MEDIA_ROOT/properties by default) to Cloudinary and point "
+            "Property image fields at the uploaded assets. A manifest (MediaFile) remembers each file's "
+            "size/mtime/hash and asset, so only new or modified files are read and uploaded, and a run "
+            "with nothing to do only stats the tree. Replaces migrate_to_cloudinary(_v2), "
+            "migrate_media_to_cloudinary_secureurl and update_cloudinary.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", action="append", dest="dirs",
+                            help="Directory under MEDIA_ROOT to sync; repeatable (default: properties).")
+        parser.add_argument("--folder", default="properties", help="Cloudinary folder to upload to (default: properties).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk write (default: 500).")
+        parser.add_argument("--no-update-properties", action="store_true",
+                            help="Only sync files and the manifest; leave Property fields alone.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be uploaded/updated, without doing it.")
+        parser.add_argument("--perceptual", action="store_true",
+                            help="Also reuse assets for near-identical images (dHash), not just identical bytes.")
+        uploads.add_arguments(parser)
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        dry = options["dry_run"]
+        root = str(settings.MEDIA_ROOT)
+        start = time.perf_counter()
+
+        # 1) stat the tree against the manifest; only files whose size/mtime moved are read
+        manifest = {e.path: e for e in MediaFile.objects.all()}
+        seen = set()
+        changed = []
+        for rel_dir in options["dirs"] or ["properties"]:
+            for rel, st in walk(root, rel_dir):
+                seen.add(rel)
+                entry = manifest.get(rel)
+                if entry is None or entry.asset_id is None or entry.size != st.st_size or entry.mtime_ns != st.st_mtime_ns:
+                    changed.append((rel, st))
+        vanished = [e for path, e in manifest.items() if path not in seen
+                    and any(path.startswith(d.strip("/") + "/") for d in options["dirs"] or ["properties"])]
+        self.stdout.write(f"Scanned {len(seen)} files in {time.perf_counter() - start:.2f}s: "
+                          f"{len(seen) - len(changed)} unchanged, {len(changed)} new/modified, {len(vanished)} gone.")
+
+        # 2) hash the changed files; content already on Cloudinary (e.g. a touched file) needs no upload
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            hashes = list(pool.map(file_sha256, [os.path.join(root, rel) for rel, _ in changed]))
+        known = MediaAsset.objects.in_bulk(set(hashes), field_name="sha256")
+        synced = {}  # rel -> (stat, sha256, asset)
+        jobs = []
+        for (rel, st), sha in zip(changed, hashes):
+            if sha in known:
+                synced[rel] = (st, sha, known[sha])
+            else:
+                jobs.append(uploads.UploadJob(
+                    key=f"{rel}:{sha}",
+                    source=os.path.join(root, rel),
+                    options={"folder": options["folder"], "use_filename": True, "unique_filename": True,
+                             "overwrite": False},
+                    payload=(rel, st, sha),
+                ))
+        self.stdout.write(f"{len(jobs)} files to upload; {len(synced)} changed files match stored assets.")
+
+        if dry:
+            if not options["no_update_properties"]:
+                assets = {**self.assets_by_path(), **{rel: asset for rel, (_, _, asset) in synced.items()}}
+                would = self.update_properties(assets, dry=True)
+                self.stdout.write(f"{would} properties would be repointed (not counting files still to upload).")
+            self.stdout.write("Dry-run complete. No uploads or DB changes made.")
+            return
+
+        # 3) upload the rest through the shared engine (concurrent, rate limited, journalled)
+        stats = None
+        if jobs:
+            def apply(result):
+                rel, st, sha = result.job.payload
+                synced[rel] = (st, sha, result.asset)
+
+            journal = uploads.open_journal("sync_media", options["journal"], options["restart"])
+            try:
+                stats = uploads.run(jobs, apply, journal=journal, workers=options["workers"], rate=options["rate"],
+                                    retries=options["retries"], perceptual=options["perceptual"] or None,
+                                    log=self.stdout.write)
+            finally:
+                journal.close()
+            self.stdout.write(stats.summary())
+
+        # 4) manifest, in bulk
+        self.write_manifest(manifest, synced, vanished)
+
+        # 5) properties still pointing at local files -> their assets, in bulk
+        updated = 0
+        if not options["no_update_properties"]:
+            updated = self.update_properties(self.assets_by_path())
+
+        failed = stats.failed if stats else 0
+        msg = (f"Done in {time.perf_counter() - start:.2f}s. Manifest: {len(synced)} files synced, "
+               f"{len(vanished)} removed. Properties updated: {updated}. Upload failures: {failed}.")
+        self.stdout.write(self.style.WARNING(msg) if failed else self.style.SUCCESS(msg))
+
+    def write_manifest(self, manifest, synced, vanished):
+        now = timezone.now()
+        new, existing = [], []
+        for rel, (st, sha, asset) in synced.items():
+            entry = manifest.get(rel)
+            if entry is None:
+                new.append(MediaFile(path=rel, size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=sha, asset=asset))
+            else:
+                entry.size, entry.mtime_ns, entry.sha256, entry.asset = st.st_size, st.st_mtime_ns, sha, asset
+                entry.synced_at = now  # bulk_update does not apply auto_now
+                existing.append(entry)
+        for offset in range(0, max(len(new), len(existing)), self.batch_size):
+            with transaction.atomic():
+                MediaFile.objects.bulk_create(new[offset:offset + self.batch_size])
+                MediaFile.objects.bulk_update(existing[offset:offset + self.batch_size],
+                                              ["size", "mtime_ns", "sha256", "asset", "synced_at"])
+        if vanished:
+            MediaFile.objects.filter(pk__in=[e.pk for e in vanished]).delete()
+
+    def assets_by_path(self):
+        return {e.path: e.asset for e in MediaFile.objects.select_related("asset").exclude(asset=None)}
+
+    def update_properties(self, assets, dry=False):
+        """Repoint image fields that still hold a local path with a synced asset; returns how many properties."""
+        if not assets:
+            return 0
+        fields = {f: Property._meta.get_field(f) for f in IMAGE_FIELDS}
+
+        def changes(p):
+            new_values = {}
+            for name, field in fields.items():
+                asset = assets.get(local_name(getattr(p, name)))
+                if asset is not None:
+                    new_values[name] = media_index.resource(asset, resource_type=field.resource_type,
+                                                            upload_type=field.type)
+            return new_values
+
+        # locks only the rows being repointed, re-reads them and writes just the fields that change,
+        # so an admin edit made during the run is neither blocked for long nor overwritten
+        result = maintenance.rewrite_images(changes, batch_size=self.batch_size, dry_run=dry, log=self.stdout.write)
+        if result.updated and not dry:
+            self.stdout.write("Image URLs changed: run `manage.py compute_lqip` to refresh their placeholders.")
+        return result.updated
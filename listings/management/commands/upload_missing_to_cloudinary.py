@@ -3,7 +3,7 @@ import os
 from pathlib import Path
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from cloudinary import uploader, api
+from listings import cloud_resources, media_index, uploads
 from listings.models import Property
 
 MEDIA_ROOT = Path(getattr(settings, "MEDIA_ROOT", Path(__file__).resolve().parents[3] / "media"))
@@ -15,57 +15,56 @@ def is_cloudinary_public_id(value: str):
     # a simple heuristic: contains folder 'properties/' and no leading http
     return "properties/" in s and not s.startswith("http")
 
-def public_id_from_db_value(value: str):
-    # Accept values like: "properties/name.jpg" or "properties/name"
-    if not value:
-        return None
-    s = str(value)
-    if s.startswith("http"):
-        # extract after /upload/ and drop version if present
-        try:
-            part = s.split("/upload/")[1]
-            if part.startswith("v") and "/" in part:
-                part = "/".join(part.split("/")[1:])
-            public_id = part.rsplit(".", 1)[0]
-            return public_id
-        except Exception:
-            return None
-    else:
-        return s.rsplit(".", 1)[0] if "." in s else s
+# Accept values like: "properties/name.jpg" or "properties/name" (or a delivery URL)
+public_id_from_db_value = cloud_resources.public_id_from_value
 
 class Command(BaseCommand):
-    help = "Upload missing local media files referenced by Property model to Cloudinary"
+    help = ("Upload missing local media files referenced by Property model to Cloudinary. "
+            "Uploads run concurrently and are journalled, so an interrupted run resumes where it stopped.")
 
     def add_arguments(self, parser):
         parser.add_argument("--dry-run", action="store_true", help="Don't save DB changes; just report.")
         parser.add_argument("--folder", default="properties", help="Cloudinary folder to upload to (default: properties)")
+        parser.add_argument("--perceptual", action="store_true",
+                            help="Also reuse assets for near-identical images (dHash), not just identical bytes.")
+        uploads.add_arguments(parser)
 
     def handle(self, *args, **options):
         dry = options["dry_run"]
         folder = options["folder"]
-        props = Property.objects.all()
-        total = props.count()
+        props = list(Property.objects.all())
+        total = len(props)
         self.stdout.write(f"Found {total} properties. Scanning...")
 
-        updated = 0
+        # 1) Existence of everything the DB says is already on Cloudinary, checked up front in
+        # batches of 100 and cached locally (listings/cloud_resources.py), not one call per field
+        candidates = [
+            public_id_from_db_value(str(getattr(p, f)))
+            for p in props for f in ("cover", "gallery1", "gallery2")
+            if getattr(p, f) and is_cloudinary_public_id(str(getattr(p, f)))
+        ]
+        try:
+            on_cloud, calls = cloud_resources.lookup(candidates)
+            self.stdout.write(f"Checked {len(set(candidates))} public ids on Cloudinary with {calls} API call(s).")
+        except Exception as e:
+            # auth error, rate limited... -> try local uploads for all of them
+            self.stdout.write(f"Cloudinary check failed: {e} (will try local upload if file present)")
+            on_cloud = {}
+
+        jobs = []
         for idx, p in enumerate(props, start=1):
             self.stdout.write(f"[{idx}/{total}] Property {p.id} - {p.title}")
-            changed = False
 
             for field_name in ("cover", "gallery1", "gallery2"):
                 field = getattr(p, field_name)
                 raw = str(field) if field else ""
                 public_candidate = public_id_from_db_value(raw)
 
-                # 1) If DB already points to a cloudinary public id, check Cloudinary for resource existence
                 if public_candidate and is_cloudinary_public_id(raw):
-                    try:
-                        api.resource(public_candidate)
+                    if on_cloud.get(public_candidate):
                         self.stdout.write(f"  {field_name}: already on Cloudinary ({public_candidate}) -> skip")
                         continue
-                    except Exception as e:
-                        # Not found or auth error -> we may try to upload local file if present
-                        self.stdout.write(f"  {field_name}: Cloudinary check: {e} (will try local upload if file present)")
+                    self.stdout.write(f"  {field_name}: not found on Cloudinary ({public_candidate}) (will try local upload if file present)")
 
                 # 2) Try local file path: prefer field.path if available; otherwise, construct from MEDIA_ROOT + raw name
                 local_path = None
@@ -80,25 +79,41 @@ class Command(BaseCommand):
                     local_path = None
 
                 if local_path and local_path.exists():
-                    # upload to cloudinary
-                    try:
-                        self.stdout.write(f"  {field_name}: uploading local file {local_path} -> Cloudinary/{folder}")
-                        res = uploader.upload(str(local_path), folder=folder)
-                        # res['public_id'] will be like 'properties/name' (without extension)
-                        ext = local_path.suffix.lstrip(".").lower()
-                        public_with_ext = f"{res['public_id']}.{ext}" if ext else res['public_id']
-                        if not dry:
-                            setattr(p, field_name, public_with_ext)
-                            changed = True
-                        self.stdout.write(f"    uploaded -> {public_with_ext}")
-                    except Exception as e:
-                        self.stdout.write(f"    ERROR uploading {local_path}: {e}")
+                    self.stdout.write(f"  {field_name}: will upload local file {local_path} -> Cloudinary/{folder}")
+                    jobs.append(uploads.UploadJob(
+                        key=f"{p.pk}:{field_name}:{raw}",
+                        source=str(local_path),
+                        options={"folder": folder},
+                        payload=(p, field_name),
+                    ))
                 else:
                     self.stdout.write(f"  {field_name}: no local file found for DB value '{raw}' -> skipping")
 
-            if changed and not dry:
-                p.save()
-                updated += 1
-                self.stdout.write(f"  [SAVED] Property {p.id}")
+        if dry:
+            self.stdout.write(f"Dry run. Would upload {len(jobs)} files.")
+            return
+
+        saved = set()
+
+        def apply(result):
+            p, field_name = result.job.payload
+            field = p._meta.get_field(field_name)
+            # the stored asset as a CloudinaryResource (public_id, format and version), like sync_media;
+            # Property.save() recomputes image_urls and bumps updated_at for these update_fields
+            setattr(p, field_name, media_index.resource(result.asset, resource_type=field.resource_type,
+                                                        upload_type=field.type))
+            p.save(update_fields=[field_name])
+            saved.add(p.pk)
+
+        journal = uploads.open_journal("upload_missing_to_cloudinary", options["journal"], options["restart"])
+        try:
+            # skips the upload when the same content is already stored (listings/media_index.py)
+            stats = uploads.run(
+                jobs, apply, journal=journal,
+                workers=options["workers"], rate=options["rate"], retries=options["retries"],
+                perceptual=options["perceptual"] or None, log=self.stdout.write,
+            )
+        finally:
+            journal.close()
 
-        self.stdout.write(f"Done. Updated {updated}")
+        self.stdout.write(f"Done. Updated {len(saved)}. {stats.summary()}")
@@ -1,8 +1,7 @@
 # listings/management/commands/upload_placeholders_to_cloudinary.py
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from django.db import transaction
-from listings.models import Property
+from listings.maintenance import rewrite_images
 import os
 
 # optional dependency
@@ -20,6 +19,11 @@ CLOUD_FOLDER = "properties"
 class Command(BaseCommand):
     help = "Upload placeholder image to Cloudinary (prefer local file) and replace placeholder/local URLs in Property image fields."
 
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Properties read (and at most locked) per chunk/transaction (default: 500).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per UPDATE statement (default: 500).")
+
     def handle(self, *args, **options):
         # 1) ensure cloudinary is configured and available
         if cloudinary is None:
@@ -63,40 +67,35 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f"Uploaded placeholder to Cloudinary: {cloud_url} (public_id: {public_id})"))
 
-        # 4) replace placeholder/local images in DB
-        updated = 0
+        # 4) replace placeholder/local images in DB: chunked bulk updates that lock only
+        # the rows being changed, one short transaction per chunk (listings/maintenance.py)
         fields = ("cover", "gallery1", "gallery2")
-        with transaction.atomic():
-            for p in Property.objects.select_for_update().all():
-                changed = False
-                for fname in fields:
-                    f = getattr(p, fname, None)
-                    url = getattr(f, "url", "") or ""
-                    # Flags identifying values to replace:
-                    # - exact local placeholder saved as URL
-                    # - stored value is local /media/ path
-                    # - not a cloudinary url (heuristic)
-                    if (
-                        url.endswith("placeholder_600x400.png")
-                        or url.startswith("/media/")
-                        or "res.cloudinary.com" not in url
-                    ):
-                        # If field is a CloudinaryField, setting a url string may not be ideal,
-                        # but in many setups CloudinaryField accepts a URL string and storage layer
-                        # will produce the correct URL. We set the field to the secure cloud URL.
-                        try:
-                            setattr(p, fname, cloud_url)
-                        except Exception:
-                            # fallback: try setting attribute on filefield file
-                            try:
-                                getattr(p, fname).name = public_id
-                            except Exception:
-                                setattr(p, fname, cloud_url)
-                        changed = True
 
-                if changed:
-                    p.save()
-                    updated += 1
-                    self.stdout.write(self.style.SUCCESS(f"Updated {p.pk} — {p.title}"))
+        def changes(p):
+            new_values = {}
+            for fname in fields:
+                f = getattr(p, fname, None)
+                url = getattr(f, "url", "") or ""
+                # Flags identifying values to replace:
+                # - exact local placeholder saved as URL
+                # - stored value is local /media/ path
+                # - not a cloudinary url (heuristic)
+                if (
+                    url.endswith("placeholder_600x400.png")
+                    or url.startswith("/media/")
+                    or "res.cloudinary.com" not in url
+                ):
+                    # stored as the secure cloud URL; CloudinaryField keeps full URLs as they are
+                    new_values[fname] = cloud_url
+            return new_values
+
+        def report(p, new_values):
+            if new_values:
+                self.stdout.write(f"Replacing {', '.join(new_values)} on {p.pk} — {p.title}")
+
+        result = rewrite_images(changes, chunk_size=options["chunk_size"], batch_size=options["batch_size"],
+                                log=self.stdout.write, report=report)
 
-        self.stdout.write(self.style.SUCCESS(f"Done. Replaced images on {updated} properties."))
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. Replaced images on {result.updated} of {result.scanned} properties in {result.seconds:.2f}s."
+        ))
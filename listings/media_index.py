@@ -0,0 +1,145 @@
+# listings/media_index.py
+"""
+Content-hash deduplication for Cloudinary uploads.
+
+media/properties/ holds byte-identical copies of the same WhatsApp photo
+under different names (Django's "_AITS86e" collision suffixes); uploading each
+one separately wastes bandwidth and Cloudinary storage. Every upload path
+hashes the file first and asks MediaAsset whether those bytes were stored
+before; only unseen content is uploaded, and then recorded.
+
+Exact matching uses SHA-256. Near-duplicates (the same photo re-encoded by
+WhatsApp) can optionally be matched on a 64-bit difference hash (dHash),
+within PERCEPTUAL_MAX_DISTANCE differing bits; this is opt-in because two
+different photos of similar rooms can land close together.
+"""
+import hashlib
+from io import BytesIO
+
+from cloudinary import CloudinaryResource, uploader
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from PIL import Image
+
+from .models import MediaAsset
+
+PERCEPTUAL_MAX_DISTANCE = 4
+
+
+def _is_path(source):
+    return isinstance(source, str) or hasattr(source, "__fspath__")
+
+
+def _read(source):
+    """Bytes of a path or a file-like object (rewound before and after)."""
+    if _is_path(source):
+        with open(source, "rb") as fh:
+            return fh.read()
+    source.seek(0)
+    data = source.read()
+    source.seek(0)
+    return data
+
+
+def sha256_of(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def dhash_of(data, size=8):
+    """64-bit difference hash as 16 hex chars, or "" if `data` is not an image."""
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image.draft("L", (size * 4, size * 4))  # JPEG: decode at reduced scale, it is all we need
+            pixels = list(image.convert("L").resize((size + 1, size), Image.LANCZOS).getdata())
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return ""
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (size + 1) + col + 1])
+    return f"{bits:016x}"
+
+
+def find(sha256, phash="", perceptual=False):
+    """Stored asset for these bytes (or, if `perceptual`, a near-identical image), else None."""
+    asset = MediaAsset.objects.filter(sha256=sha256).first()
+    if asset or not (perceptual and phash):
+        return asset
+    target = int(phash, 16)
+    for pk, other in MediaAsset.objects.exclude(phash="").values_list("pk", "phash").iterator():
+        if bin(target ^ int(other, 16)).count("1") <= PERCEPTUAL_MAX_DISTANCE:
+            return MediaAsset.objects.get(pk=pk)
+    return None
+
+
+def remember(sha256, phash, result):
+    """Record a Cloudinary upload response for these bytes; returns the MediaAsset."""
+    try:
+        # a savepoint, so losing the race inside a caller's transaction (admin save) only rolls back this insert
+        with transaction.atomic():
+            return MediaAsset.objects.create(
+                sha256=sha256,
+                phash=phash,
+                public_id=result["public_id"],
+                format=result.get("format") or "",
+                version=str(result.get("version") or ""),
+                secure_url=result.get("secure_url") or result.get("url") or "",
+                bytes=result.get("bytes") or 0,
+            )
+    except IntegrityError:
+        # a concurrent upload of the same bytes won the race; keep the first asset
+        return MediaAsset.objects.get(sha256=sha256)
+
+
+def upload(source, perceptual=None, before_upload=None, **options):
+    """
+    Upload `source` (path or file) to Cloudinary unless the same content is already there.
+    Returns (MediaAsset, reused). `options` go to cloudinary.uploader.upload;
+    `before_upload()` is called only when a request is actually made (e.g. a rate limiter).
+    """
+    if perceptual is None:
+        perceptual = settings.LISTINGS_MEDIA_DEDUP_PERCEPTUAL
+    data = _read(source)
+    sha256 = sha256_of(data)
+    phash = dhash_of(data)
+    asset = find(sha256, phash, perceptual)
+    if asset is not None:
+        return asset, True
+    if before_upload is not None:
+        before_upload()
+    result = uploader.upload(str(source) if _is_path(source) else source, **options)
+    return remember(sha256, phash, result), False
+
+
+def resource(asset, resource_type="image", upload_type="upload"):
+    """CloudinaryField value for a stored asset."""
+    return CloudinaryResource(
+        public_id=asset.public_id,
+        format=asset.format or None,
+        version=asset.version or None,
+        type=upload_type,
+        resource_type=resource_type,
+    )
+
+
+def store_uploads(obj, fields):
+    """
+    Replace every pending upload among `fields` of `obj` (admin form data) with the
+    CloudinaryResource of its stored asset, uploading only content not seen before.
+    Returns {field: reused} for the fields that held an upload.
+    """
+    stored = {}
+    for name in fields:
+        value = getattr(obj, name, None)
+        if not isinstance(value, UploadedFile):
+            continue
+        field = obj._meta.get_field(name)
+        # same options CloudinaryField.pre_save would have used
+        options = {"type": field.type, "resource_type": field.resource_type}
+        options.update({k: v(obj) if callable(v) else v for k, v in field.options.items()})
+        asset, reused = upload(value, **options)
+        setattr(obj, name, resource(asset, resource_type=field.resource_type, upload_type=field.type))
+        stored[name] = reused
+    return stored
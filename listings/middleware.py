@@ -0,0 +1,13 @@
+# listings/middleware.py
+from .images import url_memo
+
+
+class ImageURLMemoMiddleware:
+    """Give each request its own memo of resolved image URLs (see listings.images)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with url_memo():
+            return self.get_response(request)
@@ -0,0 +1,59 @@
+# Full-text search index for Property (see listings/search.py).
+#
+# SQLite: FTS5 table kept in sync by listings.signals.
+# Postgres: generated weighted tsvector column + GIN index, maintained by Postgres.
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS listings_property_fts USING fts5(
+        title, location, description,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO listings_property_fts (rowid, title, location, description)
+    SELECT id, COALESCE(title, ''), COALESCE(location, ''), COALESCE(description, '')
+    FROM listings_property
+    """,
+]
+SQLITE_REVERSE = ["DROP TABLE IF EXISTS listings_property_fts"]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE listings_property ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS listings_property_search_gin ON listings_property USING GIN (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS listings_property_search_gin",
+    "ALTER TABLE listings_property DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0008_alter_property_category_alter_unitoption_unit_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
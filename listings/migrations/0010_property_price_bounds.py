@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:03
+
+from django.db import migrations, models
+from django.db.models import Max, Min
+
+
+def backfill_price_bounds(apps, schema_editor):
+    Property = apps.get_model('listings', 'Property')
+    rows = Property.objects.annotate(opt_min=Min('options__price'), opt_max=Max('options__price'))
+    changed = []
+    for p in rows:
+        prices = [v for v in (p.price, p.opt_min, p.opt_max) if v is not None]
+        p.min_price = min(prices) if prices else None
+        p.max_price = max(prices) if prices else None
+        changed.append(p)
+    Property.objects.bulk_update(changed, ['min_price', 'max_price'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0009_property_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='max_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='min_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill_price_bounds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0010_property_price_bounds'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['-is_featured', '-created_at'], name='property_featured_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['-created_at'], name='property_featured_only_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['category', '-created_at'], name='property_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['-created_at', '-id'], name='property_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price'], name='property_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='unitoption',
+            index=models.Index(fields=['property', 'price'], name='unitoption_property_price_idx'),
+        ),
+    ]
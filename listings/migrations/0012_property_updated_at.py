@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0011_listing_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0012_property_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='image_urls',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
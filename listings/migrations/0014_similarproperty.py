@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0013_property_image_urls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProperty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='listings.property')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='listings.property')),
+            ],
+            options={
+                'ordering': ['property', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('property', 'rank'), name='similarproperty_property_rank_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0014_similarproperty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaAsset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('phash', models.CharField(blank=True, db_index=True, max_length=16)),
+                ('public_id', models.CharField(max_length=255)),
+                ('format', models.CharField(blank=True, max_length=10)),
+                ('version', models.CharField(blank=True, max_length=20)),
+                ('secure_url', models.URLField(max_length=500)),
+                ('bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0015_mediaasset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='image_lqip',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
+from django.db.models import Max, Min
 from django.urls import reverse
 from cloudinary.models import CloudinaryField
 
+from .images import IMAGE_FIELDS, compute_image_urls, live_image_urls
+
 class Category(models.TextChoices):
     STUDIO = 'STUDIO', 'Studio Apartment'
     DIPLEX = 'DUPLEX', 'Duplex'
@@ -34,11 +37,38 @@ class Property(models.Model):
     cover = CloudinaryField('cover', blank=True, null=True)
     gallery1 = CloudinaryField('gallery1', blank=True, null=True)
     gallery2 = CloudinaryField('gallery2', blank=True, null=True)
+    # Resolved secure URLs of the fields above, e.g. {"cover": "https://...", "gallery1": "..."},
+    # plus "placeholder": true when there is no cover. Computed in save(); NULL means
+    # "not computed yet" or "could not be resolved" (readers fall back to the fields). Rebuild with `manage.py backfill_image_urls`.
+    image_urls = models.JSONField(blank=True, null=True, editable=False)
+    # Tiny blurred previews of the same images, {"cover": [source_url, "data:image/jpeg;base64,..."]},
+    # painted behind <img> while the real image loads. Filled in by `manage.py compute_lqip`
+    # (or on save with LISTINGS_LQIP_ON_SAVE, see listings.signals).
+    image_lqip = models.JSONField(blank=True, null=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; lets per-card caches (listings/cards.py) tell when a card went stale
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Lowest / highest of `price` and every UnitOption.price, so the list view can
+    # filter on a single indexed range instead of joining options.
+    # Maintained by listings.signals; rebuild with `manage.py backfill_price_bounds`.
+    min_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, db_index=True, editable=False)
+    max_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, db_index=True, editable=False)
 
     class Meta:
         ordering = ['-is_featured', '-created_at']
+        # Shaped for the real queries: see `manage.py explain_listing_queries`
+        indexes = [
+            # default ordering, and home(): featured first, newest first
+            models.Index(fields=['-is_featured', '-created_at'], name='property_featured_created_idx'),
+            # home() only ever reads featured rows; keep a small partial index for them
+            models.Index(fields=['-created_at'], condition=models.Q(is_featured=True), name='property_featured_only_idx'),
+            # property_list: ?cat= filter ordered by newest (and the keyset (created_at, id) walk)
+            models.Index(fields=['category', '-created_at'], name='property_category_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='property_created_id_idx'),
+            models.Index(fields=['price'], name='property_price_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -46,6 +76,53 @@ class Property(models.Model):
     def get_absolute_url(self):
         return reverse("listings:detail", args=[self.slug])
 
+    def save(self, *args, **kwargs):
+        # CloudinaryField uploads a pending file in its pre_save and swaps in the resource;
+        # do that now so the URLs below are the final ones (the second pre_save is a no-op)
+        for name in IMAGE_FIELDS:
+            field = self._meta.get_field(name)
+            field.pre_save(self, self._state.adding)
+            # CloudinaryField has no descriptor: a plain "properties/name.jpg" assigned in code
+            # stays a str until the row is reloaded; parse it as from_db_value would
+            value = getattr(self, name)
+            if isinstance(value, str) and value:
+                setattr(self, name, field.to_python(value))
+        self.image_urls = compute_image_urls(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            # auto_now is only written when listed: without it the card cache key
+            # (pk, updated_at; listings/cards.py) would keep serving the old markup
+            extra = {"updated_at"}
+            if set(update_fields) & set(IMAGE_FIELDS):
+                extra.add("image_urls")
+            kwargs["update_fields"] = {*update_fields, *extra}
+        super().save(*args, **kwargs)
+
+    def image_url_map(self):
+        """Persisted image_urls, or the same dict computed on the fly for rows not yet backfilled."""
+        return self.image_urls if self.image_urls is not None else live_image_urls(self)
+
+    @staticmethod
+    def price_bounds(price, option_prices):
+        """Return (min, max) over a property price and its option prices, ignoring blanks."""
+        prices = [p for p in (price, *option_prices) if p is not None]
+        if not prices:
+            return None, None
+        return min(prices), max(prices)
+
+    @classmethod
+    def refresh_price_bounds(cls, pk):
+        """Recompute min_price/max_price for one property (one aggregate + one UPDATE)."""
+        row = (cls.objects.filter(pk=pk)
+               .annotate(opt_min=Min('options__price'), opt_max=Max('options__price'))
+               .values('price', 'opt_min', 'opt_max')
+               .first())
+        if row is None:
+            return None, None
+        lo, hi = cls.price_bounds(row['price'], (row['opt_min'], row['opt_max']))
+        cls.objects.filter(pk=pk).update(min_price=lo, max_price=hi)
+        return lo, hi
+
 
 class UnitOption(models.Model):
     property = models.ForeignKey(Property, related_name='options', on_delete=models.CASCADE)
@@ -58,10 +135,74 @@ class UnitOption(models.Model):
     plan_6_12 = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, default=0)
     notes = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            # price bounds aggregate (Min/Max per property) and options price lookups
+            models.Index(fields=['property', 'price'], name='unitoption_property_price_idx'),
+        ]
+
     def __str__(self):
         return f"{self.property.title} – {self.get_unit_type_display()}"
 
 
+class SimilarProperty(models.Model):
+    """
+    One precomputed "similar listing" link: `similar` is the `rank`-th best match for `property`.
+    Rebuilt in full by `manage.py compute_similar_properties` (see listings/similar.py).
+    """
+    property = models.ForeignKey(Property, related_name='similar_links', on_delete=models.CASCADE)
+    similar = models.ForeignKey(Property, related_name='+', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['property', 'rank']
+        constraints = [
+            # also the index the detail page reads through: property_id = ? ORDER BY rank
+            models.UniqueConstraint(fields=['property', 'rank'], name='similarproperty_property_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id} → {self.similar_id} (#{self.rank})"
+
+
+class MediaAsset(models.Model):
+    """
+    Content index of uploaded images: one row per distinct file (SHA-256 of its bytes),
+    pointing at the Cloudinary asset it was stored as. Upload paths look files up here
+    first and reuse the asset instead of uploading a duplicate (see listings/media_index.py).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    # 64-bit difference hash (hex) for optional near-duplicate matching; blank if not an image
+    phash = models.CharField(max_length=16, blank=True, db_index=True)
+    public_id = models.CharField(max_length=255)
+    format = models.CharField(max_length=10, blank=True)
+    version = models.CharField(max_length=20, blank=True)
+    secure_url = models.URLField(max_length=500)
+    bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.public_id
+
+
+class MediaFile(models.Model):
+    """
+    Sync manifest: one row per local file under MEDIA_ROOT that `manage.py sync_media`
+    has seen, with the size/mtime it had then. Files whose stat still matches are
+    neither re-read nor re-uploaded.
+    """
+    path = models.CharField(max_length=500, unique=True)  # relative to MEDIA_ROOT, "/" separated
+    size = models.BigIntegerField()
+    mtime_ns = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64, db_index=True)
+    asset = models.ForeignKey(MediaAsset, on_delete=models.SET_NULL, null=True, blank=True, related_name="files")
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.path
+
+
 class Lead(models.Model):
     name = models.CharField(max_length=120)
     email = models.EmailField(blank=True)
@@ -0,0 +1,78 @@
+# listings/page_cache.py
+"""
+Full-page cache for anonymous visitors, with conditional GET.
+
+The rendered bytes are stored together with a strong ETag (hash of the body)
+and a Last-Modified time. A request carrying a matching If-None-Match (or an
+If-Modified-Since that is not older than the entry) gets a 304 without the
+view or the template engine running at all. Authenticated users, and any
+non-GET/HEAD request, always go straight to the view.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+PAGE_TTL = 60 * 60
+
+
+def _is_anonymous(request):
+    user = getattr(request, "user", None)
+    return user is None or not user.is_authenticated
+
+
+def _not_modified(request, entry):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or entry["etag"] in tags
+    since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return since is not None and int(entry["last_modified"]) <= since
+
+
+def _headers(response, entry):
+    response["ETag"] = entry["etag"]
+    response["Last-Modified"] = http_date(entry["last_modified"])
+    # shared caches must not serve this to logged-in users; browsers revalidate (cheap 304)
+    response["Cache-Control"] = "no-cache"
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def anonymous_page_cache(name, version=None, timeout=PAGE_TTL):
+    """
+    Cache a view's rendered page for anonymous users under `name`.
+
+    `version` is an optional callable whose value is part of the key, e.g.
+    listings.cache.catalogue_version for pages that show listings.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or not _is_anonymous(request):
+                return view(request, *args, **kwargs)
+
+            key = f"listings:page:{name}:v{version() if version else 0}"
+            entry = cache.get(key)
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming or response.cookies:
+                    return response
+                body = response.content
+                entry = {
+                    "body": body,
+                    "content_type": response.get("Content-Type", "text/html; charset=utf-8"),
+                    "etag": '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+                    "last_modified": time.time(),
+                }
+                cache.set(key, entry, timeout)
+
+            if _not_modified(request, entry):
+                return _headers(HttpResponseNotModified(), entry)
+            return _headers(HttpResponse(entry["body"], content_type=entry["content_type"]), entry)
+        return wrapped
+    return decorator
@@ -0,0 +1,111 @@
+# listings/pagination.py
+"""
+Keyset (cursor) pagination for the property list.
+
+Pages are keyed on (created_at, id) instead of OFFSET, so page N costs the
+same as page 1. Cursors are signed, opaque tokens; a tampered or stale
+cursor simply falls back to the first page.
+
+The total is served from the cache (refreshed every `count_ttl` seconds),
+so paging doesn't run COUNT(*) on every request.
+"""
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+CURSOR_SALT = "listings.pagination.cursor"
+
+
+def encode_cursor(obj, direction):
+    """Opaque token pointing just past `obj` in the given direction ('next' or 'prev')."""
+    return signing.dumps([obj.created_at.isoformat(), obj.pk, direction], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    """Return (created_at, pk, direction) or None for a missing/invalid token."""
+    if not token:
+        return None
+    try:
+        created_at, pk, direction = signing.loads(token, salt=CURSOR_SALT)
+        created_at = parse_datetime(created_at)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if created_at is None or direction not in ("next", "prev"):
+        return None
+    return created_at, int(pk), direction
+
+
+class CursorPage:
+    """Duck-types the bits of django.core.paginator.Page the templates use."""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, prev_cursor, total_count):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total_count = total_count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset newest-first on (created_at, id).
+
+    `count_key` names the cache entry for the total (callers pass something
+    derived from the active filters); without it no total is computed.
+    """
+
+    def __init__(self, queryset, per_page, count_key=None, count_ttl=300):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.count_key = count_key
+        self.count_ttl = count_ttl
+
+    def count(self):
+        if not self.count_key:
+            return None
+        return cache.get_or_set(self.count_key, self.queryset.order_by().count, self.count_ttl)
+
+    def get_page(self, cursor=None):
+        position = decode_cursor(cursor)
+        qs = self.queryset
+        n = self.per_page
+
+        if position is None:
+            rows = list(qs.order_by("-created_at", "-id")[:n + 1])
+            has_next, has_previous = len(rows) > n, False
+            rows = rows[:n]
+        else:
+            created_at, pk, direction = position
+            if direction == "next":
+                rows = list(qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+                            .order_by("-created_at", "-id")[:n + 1])
+                has_next, has_previous = len(rows) > n, True
+                rows = rows[:n]
+            else:
+                rows = list(qs.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+                            .order_by("created_at", "id")[:n + 1])
+                has_next, has_previous = True, len(rows) > n
+                rows = rows[:n][::-1]
+
+        return CursorPage(
+            rows,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=encode_cursor(rows[-1], "next") if rows and has_next else None,
+            prev_cursor=encode_cursor(rows[0], "prev") if rows and has_previous else None,
+            total_count=self.count(),
+        )
@@ -0,0 +1,135 @@
+# listings/search.py
+"""
+Full-text search over Property title / location / description.
+
+Backends:
+  - SQLite: an FTS5 table (listings_property_fts) kept in sync from the
+    Property post_save / post_delete signals (see listings/signals.py).
+  - Postgres: a generated, weighted tsvector column (search_vector) with a GIN
+    index. Postgres maintains it itself on every INSERT/UPDATE.
+  - Anything else falls back to the old icontains filter.
+
+Title matches rank above location matches, which rank above description
+matches. Every term is treated as a prefix, so "lek vil" finds "Lekki Villa".
+"""
+import re
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "listings_property_fts"
+
+# column weights: title, location, description
+SQLITE_BM25_WEIGHTS = (10.0, 4.0, 1.0)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(q):
+    """Split a raw search string into lowercase word tokens."""
+    return TOKEN_RE.findall((q or "").lower())
+
+
+def backend():
+    """Name of the active search backend: 'sqlite', 'postgres' or 'icontains'."""
+    if connection.vendor == "sqlite":
+        return "sqlite"
+    if connection.vendor == "postgresql":
+        return "postgres"
+    return "icontains"
+
+
+def icontains_filter(qs, q):
+    """The original (unindexed) search path. Kept for fallback and benchmarks."""
+    return qs.filter(
+        Q(title__icontains=q) |
+        Q(location__icontains=q) |
+        Q(description__icontains=q)
+    )
+
+
+def _sqlite_match_expression(tokens):
+    # "tok"* is an FTS5 prefix query; quoting keeps FTS5 operators out of user input
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def _postgres_tsquery(tokens):
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def search_queryset(qs, q, ranked=True):
+    """
+    Filter a Property queryset by the search string `q`.
+
+    With ranked=True the result is annotated with `search_rank` (higher is
+    better) and ordered by it, newest first on ties. Pass ranked=False to
+    keep the caller's ordering (e.g. for keyset pagination).
+    """
+    tokens = tokenize(q)
+    engine = backend()
+    if not tokens or engine == "icontains":
+        return icontains_filter(qs, q)
+
+    if engine == "sqlite":
+        expr = _sqlite_match_expression(tokens)
+        # Join the FTS table on rowid rather than using a correlated subquery:
+        # FTS5 evaluates MATCH once and bm25() comes along with each row.
+        weights = ", ".join(str(w) for w in SQLITE_BM25_WEIGHTS)
+        qs = qs.extra(
+            # bm25() is "lower is better"; negate it so both backends sort the same way
+            select={"search_rank": f"-bm25({FTS_TABLE}, {weights})"} if ranked else None,
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE} MATCH %s", f"{FTS_TABLE}.rowid = listings_property.id"],
+            params=[expr],
+        )
+    else:
+        tsquery = _postgres_tsquery(tokens)
+        qs = qs.filter(RawSQL(
+            "listings_property.search_vector @@ to_tsquery('simple', %s)",
+            [tsquery], output_field=BooleanField(),
+        ))
+        if ranked:
+            qs = qs.annotate(search_rank=RawSQL(
+                "ts_rank(listings_property.search_vector, to_tsquery('simple', %s))",
+                [tsquery], output_field=FloatField(),
+            ))
+
+    if ranked:
+        qs = qs.order_by("-search_rank", "-created_at")
+    return qs
+
+
+# ------------------------
+# Index maintenance (SQLite only; Postgres uses a generated column)
+# ------------------------
+def index_property(prop):
+    """(Re)index a single Property row."""
+    if backend() != "sqlite":
+        return
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [prop.pk])
+        cur.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) VALUES (%s, %s, %s, %s)",
+            [prop.pk, prop.title or "", prop.location or "", prop.description or ""],
+        )
+
+
+def unindex_property(pk):
+    """Remove a Property row from the index."""
+    if backend() != "sqlite" or pk is None:
+        return
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+
+def rebuild_index():
+    """Rebuild the whole index from listings_property (after bulk_create, raw SQL, etc.)."""
+    if backend() != "sqlite":
+        return
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE}")
+        cur.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) "
+            f"SELECT id, COALESCE(title, ''), COALESCE(location, ''), COALESCE(description, '') "
+            f"FROM listings_property"
+        )
@@ -0,0 +1,48 @@
+# listings/signals.py
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import detail, featured, lqip, search
+from .cache import bump_catalogue_version
+from .models import Property, UnitOption
+
+
+@receiver(pre_save, sender=Property)
+def property_saving(sender, instance, **kwargs):
+    # remember the stored row's flag and slug: un-featuring must refresh the home block,
+    # and a slug change must drop the detail page cached under the old slug
+    old = Property.objects.filter(pk=instance.pk).values("is_featured", "slug").first() if instance.pk else None
+    instance._was_featured = bool(old and old["is_featured"])
+    instance._old_slug = old["slug"] if old else None
+
+
+@receiver(post_save, sender=Property)
+def property_saved(sender, instance, **kwargs):
+    search.index_property(instance)
+    instance.min_price, instance.max_price = Property.refresh_price_bounds(instance.pk)
+    if settings.LISTINGS_LQIP_ON_SAVE:
+        # only images whose URL changed are fetched; before the bumps, so rebuilt caches include it
+        lqip.refresh(instance)
+    bump_catalogue_version()
+    detail.invalidate(instance.slug, getattr(instance, "_old_slug", None))
+    if instance.is_featured or getattr(instance, "_was_featured", False):
+        featured.invalidate()
+
+
+@receiver(post_delete, sender=Property)
+def property_deleted(sender, instance, **kwargs):
+    search.unindex_property(instance.pk)
+    bump_catalogue_version()
+    detail.invalidate(instance.slug)
+    if instance.is_featured:
+        featured.invalidate()
+
+
+@receiver(post_save, sender=UnitOption)
+@receiver(post_delete, sender=UnitOption)
+def unit_option_changed(sender, instance, **kwargs):
+    # property_id, not instance.property: on a cascading delete the parent is already gone
+    Property.refresh_price_bounds(instance.property_id)
+    bump_catalogue_version()
+    detail.invalidate(*Property.objects.filter(pk=instance.property_id).values_list("slug", flat=True))
@@ -0,0 +1,129 @@
+# listings/similar.py
+"""
+"Similar listings" for the detail page, precomputed in batch.
+
+`manage.py compute_similar_properties` scores every property against the
+whole catalogue with NumPy (category, area/city, bedrooms, price band) and
+stores each property's top-k in SimilarProperty. The detail page only reads
+those rows, one indexed query per property (cached per catalogue version).
+
+Price band uses min_price/max_price, which already cover Property.price and
+every UnitOption.price (see listings.signals).
+"""
+import math
+
+from django.core.cache import cache
+
+from .cache import versioned_key
+from .featured import card
+from .models import Property, SimilarProperty
+
+try:
+    import numpy as np
+except ImportError:  # only the batch command needs it; the detail page just reads the table
+    np = None
+
+TOP_K = 6
+SIMILAR_TTL = 60 * 60
+
+# score weights; a pair must share at least something to be stored (score > 0)
+W_CATEGORY = 3.0
+W_AREA = 2.0        # same first part of the location, e.g. "Lekki Phase 1"
+W_CITY = 1.0        # same last part, e.g. "Lagos"
+W_BEDROOMS = 1.0    # full at equal count, fading to 0 at BEDROOM_SPAN apart
+W_PRICE = 2.0       # full at equal price, fading to 0 at PRICE_SPAN times apart
+BEDROOM_SPAN = 3.0
+PRICE_SPAN = math.log(4)
+
+
+def _location_parts(location):
+    parts = [" ".join(p.lower().split()) for p in (location or "").split(",")]
+    parts = [p for p in parts if p]
+    return (parts[0], parts[-1]) if parts else ("", "")
+
+
+def _codes(values):
+    """Integer code per value; empty values get a unique negative code so they never match."""
+    table = {}
+    return np.array([table.setdefault(v, len(table)) if v else -1 - i for i, v in enumerate(values)], dtype=np.int32)
+
+
+def load_features():
+    """(ids, feature arrays) for the whole catalogue, in one query."""
+    rows = list(Property.objects.order_by("pk")
+                .values_list("pk", "category", "location", "bedrooms", "min_price", "max_price", "price"))
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    areas, cities = zip(*(_location_parts(r[2]) for r in rows)) if rows else ((), ())
+    prices = []
+    for _, _, _, _, lo, hi, price in rows:
+        lo = lo if lo is not None else price
+        hi = hi if hi is not None else price
+        # geometric middle of the property's price range; NaN when unpriced
+        prices.append(math.log(float(lo) * float(hi)) / 2 if lo and hi else math.nan)
+    features = {
+        "category": _codes([r[1] for r in rows]),
+        "area": _codes(areas),
+        "city": _codes(cities),
+        "bedrooms": np.array([r[3] for r in rows], dtype=np.float32),
+        "log_price": np.array(prices, dtype=np.float32),
+    }
+    return ids, features
+
+
+def score_block(features, start, stop):
+    """Scores of rows [start, stop) against every property, as a (stop-start, n) float32 array."""
+    f = features
+    block = slice(start, stop)
+    shape = (stop - start, len(f["category"]))
+    # everything below works in place on two block-sized buffers: the block is
+    # O(block x catalogue), so temporaries would dominate both time and memory
+    scores = np.zeros(shape, dtype=np.float32)
+    gap = np.empty(shape, dtype=np.float32)
+
+    for name, weight in (("category", W_CATEGORY), ("area", W_AREA), ("city", W_CITY)):
+        codes = f[name]
+        np.add(scores, weight, out=scores, where=codes[block, None] == codes[None, :])
+
+    for name, weight, span in (("bedrooms", W_BEDROOMS, BEDROOM_SPAN), ("log_price", W_PRICE, PRICE_SPAN)):
+        values = f[name]
+        np.subtract(values[block, None], values[None, :], out=gap)
+        np.abs(gap, out=gap)
+        gap *= -weight / span
+        gap += weight
+        np.fmax(gap, 0, out=gap)  # fmax also turns NaN (unpriced) into 0
+        scores += gap
+
+    # never recommend a property to itself
+    scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+    return scores
+
+
+def compute_neighbours(ids, features, top_k=TOP_K, block_size=256):
+    """Yield (property_id, [(similar_id, score), ...] best first) for every property."""
+    n = len(ids)
+    k = min(top_k, n - 1)
+    if k <= 0:
+        return
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        scores = score_block(features, start, stop)
+        # top-k per row without sorting the whole row
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        for row in range(stop - start):
+            yield int(ids[start + row]), [
+                (int(ids[j]), float(s)) for j, s in zip(top[row], top_scores[row]) if s > 0
+            ]
+
+
+def get_similar_cards(property_id, limit=TOP_K):
+    """Card dicts (see listings.featured.card) for a property's stored neighbours, best first."""
+    def build():
+        links = (SimilarProperty.objects.filter(property_id=property_id)
+                 .select_related("similar").order_by("rank")[:limit])
+        return [card(link.similar) for link in links]
+
+    return cache.get_or_set(versioned_key("similar", property_id, limit), build, SIMILAR_TTL)
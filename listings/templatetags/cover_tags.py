@@ -1,26 +1,22 @@
 # listings/templatetags/cover_tags.py
 from django import template
-from django.templatetags.static import static
-from django.utils.html import escape
+from django.utils.html import format_html
+
+from listings.images import IMAGE_FIELDS, current_url_memo, placeholder_url, resolve_image_url, responsive_attrs
+from listings.lqip import lqip_for
 
 register = template.Library()
 
-@register.filter(name="cover_url")
-def cover_url(obj, field_name="cover"):
-    """
-    Return a safe URL for an ImageField on the given object.
-    Usage in template: {{ p|cover_url:"cover" }} or default field 'cover': {{ p|cover_url }}
-    Logic:
-      - If field is empty -> return placeholder static path
-      - If field is a full URL (db stored secure_url) -> return it
-      - If field is a FieldFile with .url -> try to use that (catch ValueError)
-      - Otherwise return placeholder
-    """
-    placeholder = static("img/brand_1.png")  # change as desired
+
+def _resolve(obj, field_name):
+    placeholder = placeholder_url()
 
     # guard: obj may be a dict or model; try getattr
     try:
         if isinstance(field_name, str) and hasattr(obj, field_name):
+            urls = getattr(obj, "image_urls", None)
+            if isinstance(urls, dict):
+                return urls.get(field_name) or placeholder
             field = getattr(obj, field_name)
         else:
             # fallback: treat obj itself as the field/file
@@ -28,32 +24,61 @@ def cover_url(obj, field_name="cover"):
     except Exception:
         return placeholder
 
-    # empty
-    try:
-        # If FieldFile with no file this will be falsy (''), or .name could be None
-        name = getattr(field, "name", None)
-        if not name:
-            # if field is raw string that is empty, fallback
-            # But maybe field is a direct URL string:
-            if isinstance(field, str) and field.strip().startswith("http"):
-                return field.strip()
-            return placeholder
-    except Exception:
-        return placeholder
+    return resolve_image_url(field) or placeholder
 
-    # If it's already a URL-like string (e.g. you stored secure_url in DB)
-    s = str(field)
-    if s.startswith("http://") or s.startswith("https://"):
-        return s
 
-    # If FieldFile with .url, try to return it safely
+@register.filter(name="cover_url")
+def cover_url(obj, field_name="cover"):
+    """
+    Return a safe URL for an image field on the given object.
+    Usage in template: {{ p|cover_url:"cover" }} or default field 'cover': {{ p|cover_url }}
+    Logic:
+      - Within a request, a (pk, field) already resolved (or batch-resolved with
+        listings.images.resolve_many) is a plain dict lookup
+      - If the object carries persisted image_urls (Property, computed on save) -> read it
+      - Otherwise resolve the field value (see listings.images.resolve_image_url)
+      - Anything empty or unusable -> placeholder static path
+    """
+    memo = current_url_memo()
+    pk = getattr(obj, "pk", None)
+    if memo is None or pk is None or not isinstance(field_name, str):
+        return _resolve(obj, field_name)
+    key = (pk, field_name)
     try:
-        url = field.url
-        # ensure we return a string
-        return str(url)
-    except ValueError:
-        # no file associated
-        return placeholder
-    except Exception:
-        # final fallback
-        return placeholder
+        return memo[key]
+    except KeyError:
+        url = memo[key] = _resolve(obj, field_name)
+        return url
+
+
+@register.simple_tag
+def cover_srcset(obj, field_name="cover", sizes="100vw", aspect=None):
+    """
+    src/srcset/sizes attributes for an <img>, one candidate per settings.LISTINGS_IMAGE_WIDTHS.
+    Usage: <img {% cover_srcset p "cover" sizes="(min-width: 992px) 33vw, 100vw" %} alt="...">
+    `obj` may also be a URL string, e.g. {% cover_srcset card.image_url sizes="100vw" %}.
+    Cloudinary URLs get w_/c_fill/f_auto/q_auto transformations (f_auto picks WebP/AVIF per
+    browser); local /media/ files get Pillow derivatives; anything else is returned as plain src.
+    """
+    url = obj if isinstance(obj, str) else cover_url(obj, field_name)
+    return responsive_attrs(url, sizes=sizes, aspect=aspect)
+
+
+@register.simple_tag
+def lqip_style(obj, key="cover"):
+    """
+    style="" attribute painting the blurred placeholder (listings/lqip.py) behind an <img>.
+    Usage: <img {% cover_srcset p "cover" %} {% lqip_style p "cover" %} ...>
+    `key` is an image field name or, e.g. for the detail carousel, one of the property's image URLs.
+    `obj` may also be the data URI itself, e.g. {% lqip_style card.image_lqip %}.
+    Renders nothing when there is no placeholder.
+    """
+    if isinstance(obj, str):
+        data = obj
+    elif key in IMAGE_FIELDS:
+        data = lqip_for(obj, key)
+    else:
+        data = next((lqip_for(obj, f) for f, url in (getattr(obj, "image_urls", None) or {}).items() if url == key), "")
+    if not data:
+        return ""
+    return format_html('style="background: url({}) center / cover no-repeat"', data)
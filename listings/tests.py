@@ -0,0 +1,235 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import cloudinary
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from . import cache as listing_cache, facets, cloud_resources, derivatives, media_index, uploads
+from .filters import ListingFilters
+from .images import responsive_attrs
+from .models import MediaAsset, Property, UnitOption
+
+
+@override_settings(LISTINGS_LQIP_ON_SAVE=False)  # no image fetches from tests
+class PropertyImageURLsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # building delivery URLs only needs a cloud name; don't depend on CLOUDINARY_* in the environment
+        config = cloudinary.config()
+        self.addCleanup(setattr, config, "cloud_name", config.cloud_name)
+        config.cloud_name = "demo"
+        self.prop = Property.objects.create(title="Lekki Villa", slug="lekki-villa", location="Lekki, Lagos")
+
+    def test_str_public_id_is_resolved_on_save(self):
+        self.prop.cover = "properties/name.jpg"
+        self.prop.save(update_fields=["cover"])
+
+        stored = Property.objects.values_list("image_urls", flat=True).get(pk=self.prop.pk)
+        self.assertNotIn("placeholder", stored)
+        self.assertTrue(stored["cover"].startswith("https://"))
+        self.assertIn("properties/name.jpg", stored["cover"])
+        # same URL as computing it from the reloaded row
+        self.assertEqual(stored, Property.objects.get(pk=self.prop.pk).image_url_map())
+
+    def test_unresolvable_image_leaves_image_urls_null(self):
+        cloudinary.config().cloud_name = None  # e.g. a shell without Cloudinary credentials
+        self.prop.cover = "properties/name.jpg"
+        with self.assertLogs("listings.images", "WARNING"):
+            self.prop.save()
+
+        stored = Property.objects.get(pk=self.prop.pk)
+        self.assertIsNone(stored.image_urls)  # not a placeholder readers would trust
+        cloudinary.config().cloud_name = "demo"
+        self.assertIn("properties/name.jpg", stored.image_url_map()["cover"])
+
+    def test_update_fields_save_bumps_updated_at(self):
+        before = Property.objects.values_list("updated_at", flat=True).get(pk=self.prop.pk)
+        self.prop.cover = "properties/name.jpg"
+        self.prop.save(update_fields=["cover"])
+
+        after = Property.objects.values_list("updated_at", flat=True).get(pk=self.prop.pk)
+        self.assertGreater(after, before)
+
+
+@override_settings(LISTINGS_LQIP_ON_SAVE=False)
+class PropertyDetailCacheTests(TestCase):
+    # a miss: the property, its prefetched options, and the precomputed similar links
+    COLD_QUERIES = 3
+
+    def setUp(self):
+        cache.clear()
+        self.prop = Property.objects.create(title="Lekki Villa", slug="lekki-villa", location="Lekki, Lagos",
+                                            price=Decimal("25000000"))
+        self.option = UnitOption.objects.create(property=self.prop, unit_type="2BR", price=Decimal("30000000"))
+        self.url = self.prop.get_absolute_url()
+
+    def get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_warm_request_makes_no_queries(self):
+        with self.assertNumQueries(self.COLD_QUERIES):
+            self.get()
+        with self.assertNumQueries(0):
+            self.get()
+
+    def test_property_save_invalidates(self):
+        self.get()
+        self.prop.title = "Lekki Villa II"
+        self.prop.save()
+        with self.assertNumQueries(self.COLD_QUERIES):
+            response = self.get()
+        self.assertContains(response, "Lekki Villa II")
+
+    def test_unit_option_save_invalidates(self):
+        self.get()
+        self.option.price = Decimal("31000000")
+        self.option.save()
+        with self.assertNumQueries(self.COLD_QUERIES):
+            response = self.get()
+        self.assertContains(response, "₦31,000,000")
+
+
+class MediaIndexRememberTests(TestCase):
+    def test_duplicate_sha_returns_existing_asset_inside_a_transaction(self):
+        # TestCase wraps each test in a transaction, as ATOMIC_REQUESTS / admin saves do
+        first = MediaAsset.objects.create(sha256="a" * 64, public_id="properties/first")
+        asset = media_index.remember("a" * 64, "", {"public_id": "properties/second"})
+
+        self.assertEqual(asset.pk, first.pk)
+        # the transaction is still usable after the failed insert
+        self.assertEqual(MediaAsset.objects.count(), 1)
+
+
+@override_settings(LISTINGS_LQIP_ON_SAVE=False)
+class ResultIdCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            Property.objects.create(title=f"Villa {i}", slug=f"villa-{i}", location="Lekki, Lagos")
+
+    def test_ids_are_cached(self):
+        qs = Property.objects.order_by("pk")
+        ids = listing_cache.cached_result_ids("all", qs)
+        with self.assertNumQueries(0):
+            self.assertEqual(listing_cache.cached_result_ids("all", qs), ids)
+
+    def test_too_large_result_is_remembered(self):
+        qs = Property.objects.order_by("pk")
+        with mock.patch.object(listing_cache, "RESULT_MAX_IDS", 2):
+            self.assertIsNone(listing_cache.cached_result_ids("all", qs))
+            # no second probe of the first RESULT_MAX_IDS + 1 ids
+            with self.assertNumQueries(0):
+                self.assertIsNone(listing_cache.cached_result_ids("all", qs))
+
+
+class LocalDerivativeTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_URL="/media/",
+            LISTINGS_DERIVATIVE_CACHE_DIR=os.path.join(self.media_root, ".derivatives"),
+            LISTINGS_IMAGE_WIDTHS=[320, 480, 768, 1024],
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        os.makedirs(os.path.join(self.media_root, "properties"))
+        Image.new("RGB", (600, 400), "navy").save(os.path.join(self.media_root, "properties", "villa.jpg"))
+
+    def test_capped_widths(self):
+        self.assertEqual(derivatives.capped_widths([480, 320, 1024, 768], 600), [(320, 320), (480, 480), (600, 768)])
+        self.assertEqual(derivatives.capped_widths([320, 480], None), [(320, 320), (480, 480)])
+
+    def test_srcset_stops_at_source_width(self):
+        attrs = responsive_attrs("/media/properties/villa.jpg")
+        self.assertIn("/320/properties/villa.jpg", attrs)
+        self.assertIn(" 600w", attrs)
+        self.assertNotIn("768w", attrs)
+        self.assertNotIn("/1024/", attrs)
+
+    def test_evicted_variant_is_rendered_again(self):
+        url = derivatives.derivative_url("properties/villa.jpg", 320)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        real_get_variant = derivatives.get_variant
+
+        def evicted_before_open(*args, **kwargs):
+            out, key = real_get_variant(*args, **kwargs)
+            if not evicted_before_open.done:
+                evicted_before_open.done = True
+                os.unlink(out)  # another worker's evict() won the race
+            return out, key
+        evicted_before_open.done = False
+
+        with mock.patch.object(derivatives, "get_variant", evicted_before_open):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Image.open(BytesIO(b"".join(response.streaming_content))).width, 320)
+
+
+class UploadRetryTests(TestCase):
+    def test_only_network_errors_are_transient(self):
+        self.assertTrue(uploads.is_transient(ConnectionResetError()))
+        self.assertTrue(uploads.is_transient(TimeoutError()))
+        self.assertFalse(uploads.is_transient(FileNotFoundError("properties/gone.jpg")))
+        self.assertFalse(uploads.is_transient(PermissionError("properties/locked.jpg")))
+
+    def test_missing_source_fails_without_retrying(self):
+        job = uploads.UploadJob(key="gone", source="/nonexistent/gone.jpg", options={}, payload=None)
+        with mock.patch.object(media_index, "upload", side_effect=FileNotFoundError(job.source)), \
+                mock.patch.object(uploads.time, "sleep") as sleep, \
+                mock.patch.object(uploads, "connection"):  # _upload closes its pool thread's connection
+            result = uploads._upload(job, uploads.RateLimiter(0), retries=4, perceptual=None)
+        self.assertIsInstance(result.error, FileNotFoundError)
+        self.assertEqual(result.attempts, 1)
+        sleep.assert_not_called()
+
+
+class UploadResourceCacheTests(TestCase):
+    def test_uploaded_asset_is_cached_as_present(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        source = os.path.join(tmp, "villa.jpg")
+        Image.new("RGB", (8, 8)).save(source)
+        asset = MediaAsset.objects.create(sha256="b" * 64, public_id="properties/villa", format="jpg",
+                                          version="1712345678", bytes=631)
+        job = uploads.UploadJob(key="villa", source=source, options={"folder": "properties"}, payload=None)
+
+        with override_settings(LISTINGS_CLOUDINARY_RESOURCE_CACHE=os.path.join(tmp, "resources.json")), \
+                mock.patch.object(media_index, "upload", return_value=(asset, False)):
+            stats = uploads.run([job], lambda result: None, rate=0)
+            with mock.patch.object(cloud_resources.api, "resources_by_ids") as api_call:
+                found, calls = cloud_resources.lookup(["properties/villa"])
+
+        self.assertEqual(stats.uploaded, 1)
+        self.assertEqual(calls, 0)
+        api_call.assert_not_called()
+        self.assertEqual(found["properties/villa"]["version"], 1712345678)
+
+
+class ListingFiltersKeyTests(TestCase):
+    def test_zero_price_is_not_the_same_as_no_price(self):
+        self.assertNotEqual(ListingFilters.from_params({"minp": "0"}).key(), ListingFilters.from_params({}).key())
+        self.assertNotEqual(ListingFilters.from_params({"maxp": "0"}).key(), ListingFilters.from_params({}).key())
+
+    def test_equal_prices_share_a_key(self):
+        self.assertEqual(ListingFilters.from_params({"minp": "10"}).key(),
+                         ListingFilters.from_params({"minp": "10.00"}).key())
+
+
+@override_settings(LISTINGS_LQIP_ON_SAVE=False)
+class PriceFacetTests(TestCase):
+    def test_band_count_matches_its_link(self):
+        Property.objects.create(title="Edge", slug="edge", location="Lekki, Lagos", price=Decimal("25000000"))
+        for band in facets.compute_facets(ListingFilters.from_params({}))["price_buckets"]:
+            params = {k: str(band[k]) for k in ("minp", "maxp") if band[k] is not None}
+            linked = ListingFilters.from_params(params).apply(Property.objects.all(), ranked=False)
+            self.assertEqual(band["count"], linked.count(), band["label"])
@@ -0,0 +1,106 @@
+# listings/typeahead.py
+"""
+In-memory prefix index for search-box suggestions.
+
+Every worker process builds a sorted array of (token, phrase) pairs from
+Property.title and Property.location the first time it is asked, and rebuilds
+it when the catalogue version (listings/cache.py) moves on. Lookups are a
+bisect plus a short scan, so no database query is made per keystroke.
+"""
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from .cache import catalogue_version
+from .models import Property
+from .search import tokenize
+
+MIN_PREFIX = 2
+MAX_SCAN = 250
+
+
+def normalize(text):
+    """Lowercase and strip accents, so 'Ìkòyí' matches 'ikoyi'."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+class PrefixIndex:
+    def __init__(self, phrases):
+        """`phrases` is an iterable of display strings (duplicates are counted)."""
+        counts = {}
+        for phrase in phrases:
+            phrase = " ".join((phrase or "").split())
+            if phrase:
+                counts[phrase] = counts.get(phrase, 0) + 1
+
+        self.phrases = list(counts)
+        self.counts = [counts[p] for p in self.phrases]
+        # " tok1 tok2 ..." per phrase: `" " + word in text` is a fast word-prefix test
+        self.phrase_text = []
+        pairs = set()
+        for i, phrase in enumerate(self.phrases):
+            tokens = tokenize(normalize(phrase))
+            self.phrase_text.append(" " + " ".join(tokens))
+            pairs.update((t, i) for t in tokens)
+        pairs = sorted(pairs)
+        self.keys = [t for t, _ in pairs]
+        self.postings = [i for _, i in pairs]
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def suggest(self, q, limit=8):
+        tokens = tokenize(normalize(q))
+        if not tokens or len(tokens[-1]) < MIN_PREFIX:
+            return []
+        *complete, prefix = tokens
+        complete = [" " + w for w in complete]
+
+        start = bisect_left(self.keys, prefix)
+        seen = set()
+        candidates = []
+        for pos in range(start, min(start + MAX_SCAN, len(self.keys))):
+            if not self.keys[pos].startswith(prefix):
+                break
+            i = self.postings[pos]
+            if i in seen:
+                continue
+            seen.add(i)
+            # earlier words of the query must also appear (as word prefixes) in the phrase
+            if complete and not all(w in self.phrase_text[i] for w in complete):
+                continue
+            candidates.append(i)
+
+        # most common first (a location shared by many listings), then alphabetical
+        candidates.sort(key=lambda i: (-self.counts[i], self.phrases[i]))
+        return [self.phrases[i] for i in candidates[:limit]]
+
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def build_index():
+    phrases = []
+    for title, location in Property.objects.order_by().values_list("title", "location").iterator(chunk_size=5000):
+        phrases.append(title)
+        phrases.append(location)
+    return PrefixIndex(phrases)
+
+
+def get_index():
+    """This worker's index, rebuilt lazily when the catalogue version changes."""
+    global _index, _index_version
+    version = catalogue_version()
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = build_index()
+                _index_version = version
+    return _index
+
+
+def suggest(q, limit=8):
+    return get_index().suggest(q, limit=limit)
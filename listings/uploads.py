@@ -0,0 +1,280 @@
+# listings/uploads.py
+"""
+Shared engine for bulk Cloudinary uploads (migrate_property_covers,
+upload_missing_to_cloudinary, tools/reupload_missing_to_cloud.py).
+
+- A bounded thread pool runs the uploads; the caller's `apply` callback
+  (the database write) runs in the calling thread as results arrive.
+- Requests are spread out by a token-bucket limiter per host.
+- Transient failures (rate limiting, 5xx, socket errors) are retried with
+  exponential backoff and jitter; anything else fails the job at once.
+- Every finished job is appended to a JSONL journal. A rerun with the same
+  journal skips jobs recorded as "ok", so an interrupted run resumes where
+  it stopped. A crash between upload and journal entry costs nothing
+  either: listings.media_index recognises the content and reuses the asset.
+- Every stored asset is recorded as present in the Cloudinary resource cache
+  (listings/cloud_resources.py), so a later existence check skips the API.
+"""
+import json
+import logging
+import os
+import random
+import socket
+import ssl
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import cloudinary
+from cloudinary import exceptions
+from django.conf import settings
+from django.db import connection
+
+from . import cloud_resources, media_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 5.0          # requests per second per host
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 1.0          # seconds; doubled per attempt
+BACKOFF_MAX = 60.0
+# OSErrors worth retrying; others (FileNotFoundError, PermissionError...) are about the source file
+NETWORK_ERRORS = (ConnectionError, TimeoutError, socket.gaierror, socket.herror, ssl.SSLError)
+
+# a job: `key` identifies it in the journal, `source` is a local path, `options` go to uploader.upload
+UploadJob = namedtuple("UploadJob", "key source options payload")
+UploadResult = namedtuple("UploadResult", "job asset reused error attempts")
+
+
+def journal_path(name):
+    """Default journal location for an entry point, under BASE_DIR/var/journals/."""
+    return os.path.join(settings.BASE_DIR, "var", "journals", f"{name}.jsonl")
+
+
+def upload_host():
+    prefix = cloudinary.config().upload_prefix or "https://api.cloudinary.com"
+    return urlsplit(prefix).netloc
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(host, rate):
+    """One shared limiter per (host, rate), so concurrent runs in a process share the budget."""
+    with _limiters_lock:
+        key = (host, rate)
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(rate)
+        return _limiters[key]
+
+
+def is_transient(exc):
+    """Worth retrying: throttling, server errors, and network failures (raised as the base Error)."""
+    if isinstance(exc, (exceptions.RateLimited, exceptions.GeneralError, NETWORK_ERRORS)):
+        return True
+    return type(exc) is exceptions.Error
+
+
+def backoff(attempt):
+    """Delay before retry number `attempt` (1-based): exponential with full jitter."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+class Journal:
+    """Append-only JSONL record of finished jobs; the last entry per key wins."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by the interruption we are resuming from
+                    self.entries[entry["key"]] = entry
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.fh = open(path, "a", encoding="utf-8")
+
+    def done(self, key):
+        return self.entries.get(key, {}).get("status") == "ok"
+
+    def record(self, key, status, **data):
+        entry = {"key": key, "status": status, "at": time.time(), **data}
+        with self.lock:
+            self.entries[key] = entry
+            self.fh.write(json.dumps(entry) + "\n")
+            self.fh.flush()
+            os.fsync(self.fh.fileno())
+
+    def close(self):
+        self.fh.close()
+
+
+def add_arguments(parser):
+    """Engine options shared by every entry point (argparse parser or management command parser)."""
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent uploads (default: {DEFAULT_WORKERS}).")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Max upload requests per second to the Cloudinary host, 0 = unlimited (default: {DEFAULT_RATE}).")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"Retries per file on throttling/server/network errors (default: {DEFAULT_RETRIES}).")
+    parser.add_argument("--journal", default=None,
+                        help="Checkpoint journal (JSONL); a rerun skips files it records as done. "
+                             "Default: var/journals/<command>.jsonl")
+    parser.add_argument("--restart", action="store_true", help="Discard the journal and start over.")
+
+
+def open_journal(name, path=None, restart=False):
+    path = path or journal_path(name)
+    if restart and os.path.exists(path):
+        os.remove(path)
+    return Journal(path)
+
+
+class Stats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.uploaded = self.reused = self.failed = self.skipped = 0
+        self.bytes = 0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        elapsed = max(self.elapsed, 1e-9)
+        files = self.uploaded + self.reused
+        return (f"{self.uploaded} uploaded, {self.reused} reused, {self.failed} failed, "
+                f"{self.skipped} already done (journal) in {elapsed:.1f}s: "
+                f"{files / elapsed:.2f} files/s, {self.bytes / elapsed / 1e6:.2f} MB/s")
+
+
+def _upload(job, limiter, retries, perceptual):
+    """Worker: one job with retries. Runs in a pool thread."""
+    attempt = 0
+    try:
+        while True:
+            attempt += 1
+            try:
+                # the limiter is only consulted for real requests: media_index.upload
+                # returns stored assets without touching the network
+                asset, reused = media_index.upload(
+                    job.source, perceptual=perceptual, before_upload=limiter.acquire, **job.options)
+                return UploadResult(job, asset, reused, None, attempt)
+            except Exception as exc:
+                if attempt > retries or not is_transient(exc):
+                    return UploadResult(job, None, False, exc, attempt)
+                delay = backoff(attempt)
+                logger.warning("Upload of %s failed (%s); retry %d/%d in %.1fs",
+                               job.source, exc, attempt, retries, delay)
+                time.sleep(delay)
+    finally:
+        # each pool thread has its own DB connection (MediaAsset lookups); don't leave it open
+        connection.close()
+
+
+def run(jobs, apply, journal=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+        retries=DEFAULT_RETRIES, perceptual=None, log=None):
+    """
+    Upload every job not already done in `journal`; returns Stats.
+
+    `apply(result)` is called in this thread for each successful UploadResult
+    (typically to save the model) and the job is journalled once it returns;
+    an exception from `apply` marks the job failed. `log(message)` receives
+    one line per finished job.
+    """
+    stats = Stats()
+    log = log or (lambda message: None)
+    limiter = limiter_for(upload_host(), rate)
+    pending = []
+    for job in jobs:
+        if journal is not None and journal.done(job.key):
+            stats.skipped += 1
+        else:
+            pending.append(job)
+
+    workers = max(1, workers)
+    queue = iter(pending)
+    resources = cloud_resources.ResourceCache()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # keep a bounded window in flight rather than queueing every job up front
+            in_flight = set()
+            for job in queue:
+                in_flight.add(pool.submit(_upload, job, limiter, retries, perceptual))
+                if len(in_flight) >= workers * 2:
+                    break
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    _finish(future.result(), apply, journal, stats, log, resources)
+                    job = next(queue, None)
+                    if job is not None:
+                        in_flight.add(pool.submit(_upload, job, limiter, retries, perceptual))
+    finally:
+        # also when interrupted: what was stored so far is known to exist
+        resources.save()
+    return stats
+
+
+def _finish(result, apply, journal, stats, log, resources=None):
+    job = result.job
+    error = result.error
+    if error is None:
+        try:
+            apply(result)
+        except Exception as exc:
+            error = exc
+    if error is not None:
+        stats.failed += 1
+        log(f"[ERROR] {job.key}: {error} (after {result.attempts} attempt(s))")
+        if journal is not None:
+            journal.record(job.key, "failed", error=str(error), attempts=result.attempts)
+        return
+
+    asset = result.asset
+    if resources is not None:
+        cloud_resources.record_upload(resources, asset, resource_type=job.options.get("resource_type", "image"),
+                                      upload_type=job.options.get("type", "upload"))
+    if result.reused:
+        stats.reused += 1
+    else:
+        stats.uploaded += 1
+        stats.bytes += os.path.getsize(job.source)
+    log(f"[{'REUSE' if result.reused else 'UPLOADED'}] {job.key} -> {asset.public_id}")
+    if journal is not None:
+        journal.record(job.key, "ok", public_id=asset.public_id, secure_url=asset.secure_url,
+                       reused=result.reused, attempts=result.attempts)
@@ -14,9 +14,13 @@ urlpatterns = [
     path("properties/", views.property_list, name="property_list"),
     path("properties/<slug:slug>/", views.property_detail, name="detail"),
     path("contact/<int:pk>/", views.contact_us, name="contact_us"),
+    path("api/properties/", views.api_properties, name="api_properties"),
+    path("api/suggest/", views.api_suggest, name="api_suggest"),
+    path("media-derivatives/<int:width>/<path:path>", views.derivative, name="derivative"),
     path('__debug_cloudinary__/', debug_cloudinary),
     path('debug-featured/', views.debug_featured, name='debug-featured'),
     path("debug-config/", debug_config, name="debug_config"),
+    path("debug-cache-stats/", views.debug_cache_stats, name="debug_cache_stats"),
 ]
 
 if settings.DEBUG:
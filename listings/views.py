@@ -1,29 +1,38 @@
 import logging
+import os
 from urllib.parse import quote
 from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.utils.html import format_html
 from cloudinary.utils import cloudinary_url
 from .models import Property, Category
+from .cards import render_cards
+from .cache import cached_result_ids, catalogue_version, result_cache_stats, versioned_key
+from .facets import get_facets
+from . import derivatives
+from .detail import get_payload as get_detail_payload
+from .featured import get_featured_cards
+from .filters import ListingFilters
+from .images import placeholder_url
+from .page_cache import anonymous_page_cache
+from .pagination import KeysetPaginator
+from .similar import get_similar_cards
+from . import typeahead
 from .forms import LeadForm
 from django.shortcuts import get_object_or_404, render, redirect
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from .templatetags.cover_tags import cover_url
 
 
 
 logger = logging.getLogger(__name__)
 
-# Optionally support UnitOption if present
-try:
-    from .models import UnitOption  # noqa: F401
-    HAS_UNITOPTION = True
-except Exception:
-    HAS_UNITOPTION = False
-
-
+@anonymous_page_cache("about")
 def about(request):
     return render(request, 'listings/about.html')
 
@@ -47,10 +56,13 @@ def debug_cloudinary(request):
     return HttpResponse('<br>'.join(out))
 
 
+@anonymous_page_cache("activities")
 def activities(request):
     return render(request, 'listings/activities.html')
 
 
+# keyed on the catalogue version, so any Property edit re-renders the home page
+@anonymous_page_cache("home", version=catalogue_version)
 def home(request):
     static_slides = [
         {"img": "hero/slide-1.png", "title": "Palm City", "subtitle": "Luxury waterfront living", "url": "/properties/palm-city/"},
@@ -59,7 +71,8 @@ def home(request):
         {"img": "hero/slide-4.png", "title": "Lekki Heights", "subtitle": "Prime investment", "url": "/properties/lekki-heights/"},
     ]
 
-    featured = Property.objects.filter(is_featured=True).order_by('-created_at')[:6]
+    # precomputed cards (dicts with resolved image URLs); no queries on a warm cache
+    featured = get_featured_cards()
     whatsapp_link = "https://wa.me/2348123456789?text=Hello%20Kam%20Luxury!"
 
     return render(request, "listings/home.html", {
@@ -69,56 +82,165 @@ def home(request):
     })
 
 def property_detail(request, slug):
-    obj = get_object_or_404(Property, slug=slug)
-    images_list = [img.url for img in (obj.cover, obj.gallery1, obj.gallery2) if img][:3]
-    options = obj.options.all() if hasattr(obj, 'options') else []
+    # cached per slug: two queries on a miss (property + prefetched options), none on a hit
+    payload = get_detail_payload(slug)
+    if payload is None:
+        raise Http404("No Property matches the given query.")
     return render(request, "listings/property_detail.html", {
-        "obj": obj,
-        "images": images_list,
-        "options": options,
+        **payload,
+        # precomputed by `manage.py compute_similar_properties`
+        "similar": get_similar_cards(payload["obj"].pk),
         "whatsapp_link": "https://wa.me/2348123456789?text=I'm%20interested%20in%20this%20property"
     })
 
 def property_list(request):
     qs = Property.objects.all().order_by('-created_at')
-    q = request.GET.get('q')
-    cat = request.GET.get('cat')
-    minp = request.GET.get('minp')
-    maxp = request.GET.get('maxp')
-
-    if q:
-        qs = qs.filter(
-            Q(title__icontains=q) |
-            Q(location__icontains=q) |
-            Q(description__icontains=q)
-        )
-    if cat:
-        qs = qs.filter(category=cat)
-
-    # Price filter works with legacy Property.price or any options__price
-    if minp:
-        if HAS_UNITOPTION:
-            qs = qs.filter(Q(price__gte=minp) | Q(options__price__gte=minp))
-        else:
-            qs = qs.filter(price__gte=minp)
-    if maxp:
-        if HAS_UNITOPTION:
-            qs = qs.filter(Q(price__lte=maxp) | Q(options__price__lte=maxp))
-        else:
-            qs = qs.filter(price__lte=maxp)
+    filters = ListingFilters.from_params(request.GET)
+    # Opt-in keyset pagination (settings.LISTINGS_CURSOR_PAGINATION); a ?cursor= link always uses it
+    cursor_mode = settings.LISTINGS_CURSOR_PAGINATION or 'cursor' in request.GET
 
-    qs = qs.distinct()
+    # keyset pages walk (created_at, id), so skip relevance ordering in that mode
+    qs = filters.apply(qs, ranked=not cursor_mode)
 
-    paginator = Paginator(qs, 9)
-    page = request.GET.get('page')
-    properties = paginator.get_page(page)
+    if cursor_mode:
+        paginator = KeysetPaginator(qs, 9, count_key=versioned_key("count", filters.key()))
+        properties = paginator.get_page(request.GET.get('cursor'))
+    else:
+        page = request.GET.get('page')
+        ids = cached_result_ids(filters.key(), qs)
+        if ids is None:
+            paginator = Paginator(qs, 9)
+            properties = paginator.get_page(page)
+        else:
+            # page over the cached id list, then load only this page's rows
+            paginator = Paginator(ids, 9)
+            properties = paginator.get_page(page)
+            rows = Property.objects.in_bulk(properties.object_list)
+            properties.object_list = [rows[pk] for pk in properties.object_list if pk in rows]
     return render(request, 'listings/property_list.html', {
         'properties': properties,
+        'cards': render_cards(properties.object_list),
+        'cursor_mode': cursor_mode,
+        # active filters, so pagination links keep them
+        'filter_query': filters.querystring(),
+        'facets': get_facets(filters),
         'Category': Category,
-        'q': q, 'cat': cat, 'minp': minp, 'maxp': maxp,
+        'q': filters.q, 'cat': filters.cat, 'minp': filters.minp, 'maxp': filters.maxp,
     })
 
 
+# Columns callers may project with ?fields=; "url" and "cover_url" are computed per row
+API_MODEL_FIELDS = (
+    "id", "slug", "title", "category", "location", "description", "price", "initial_deposit",
+    "installment_plan", "bedrooms", "bathrooms", "parking", "square_meters", "is_featured",
+    "min_price", "max_price", "created_at",
+)
+API_COMPUTED_FIELDS = {"url": ("slug",), "cover_url": ("image_urls", "cover")}
+API_DEFAULT_FIELDS = ("id", "slug", "title", "category", "location", "price", "min_price", "max_price", "url", "cover_url")
+
+
+def api_properties(request):
+    """
+    Stream the filtered catalogue as NDJSON (default) or a chunked JSON array (?format=json).
+
+    Accepts the property_list filters (q, cat, minp, maxp) plus ?fields=a,b,c to
+    project columns and ?limit=N. Rows come from a .values().iterator() queryset,
+    so a full-catalogue export runs in constant memory.
+    """
+    requested = [f.strip() for f in request.GET.get("fields", "").split(",") if f.strip()] or list(API_DEFAULT_FIELDS)
+    unknown = [f for f in requested if f not in API_MODEL_FIELDS and f not in API_COMPUTED_FIELDS]
+    if unknown:
+        return JsonResponse({
+            "error": f"Unknown field(s): {', '.join(unknown)}",
+            "allowed": list(API_MODEL_FIELDS) + list(API_COMPUTED_FIELDS),
+        }, status=400)
+
+    columns = []
+    for f in requested:
+        for col in API_COMPUTED_FIELDS.get(f, (f,)):
+            if col not in columns:
+                columns.append(col)
+
+    filters = ListingFilters.from_params(request.GET)
+    qs = filters.apply(Property.objects.all(), ranked=False).order_by("-created_at", "-id").values(*columns)
+    try:
+        limit = int(request.GET.get("limit", 0))
+    except ValueError:
+        limit = 0
+    if limit > 0:
+        qs = qs[:limit]
+
+    # reverse() once, then substitute the slug per row
+    url_template = reverse("listings:detail", args=["__slug__"])
+    placeholder = placeholder_url()
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def rows():
+        for row in qs.iterator(chunk_size=2000):
+            out = {}
+            for f in requested:
+                if f == "url":
+                    out[f] = url_template.replace("__slug__", row["slug"]) if row["slug"] else None
+                elif f == "cover_url":
+                    # persisted on save; rows not yet backfilled fall back to the field
+                    urls = row["image_urls"]
+                    out[f] = cover_url(row["cover"]) if urls is None else urls.get("cover") or placeholder
+                else:
+                    out[f] = row[f]
+            yield encoder.encode(out)
+
+    if request.GET.get("format") == "json":
+        def body():
+            yield "["
+            for i, line in enumerate(rows()):
+                yield line if i == 0 else "," + line
+            yield "]"
+        return StreamingHttpResponse(body(), content_type="application/json")
+
+    return StreamingHttpResponse((line + "\n" for line in rows()), content_type="application/x-ndjson")
+
+
+def derivative(request, width, path):
+    """
+    Resized / format-converted copy of a local media image (FileSystemStorage deployments).
+    Rendered once per variant into the derivative cache (listings/derivatives.py); the URL
+    carries the source mtime, so responses are cached as immutable.
+    """
+    source = derivatives.source_path(path) if width in derivatives.allowed_widths() else None
+    if source is None:
+        raise Http404("No such image.")
+    fmt = derivatives.negotiate_format(
+        request.GET.get("fmt", "auto"), request.META.get("HTTP_ACCEPT"), os.path.splitext(source)[1].lower()
+    )
+    fh, key = derivatives.open_variant(source, width, fmt)
+    if fh is None:
+        raise Http404("Not an image.")
+
+    etag = f'"{key[:32]}"'
+    if etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+        fh.close()
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(fh, content_type=derivatives.FORMATS[fmt])
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    if request.GET.get("fmt", "auto") not in derivatives.FORMATS:
+        patch_vary_headers(response, ("Accept",))
+    return response
+
+
+def api_suggest(request):
+    """Search-box suggestions (titles and locations) from the in-memory prefix index."""
+    q = request.GET.get("q", "")
+    try:
+        limit = min(max(int(request.GET.get("limit", 8)), 1), 20)
+    except ValueError:
+        limit = 8
+    response = JsonResponse({"q": q, "suggestions": typeahead.suggest(q, limit=limit)})
+    response["Cache-Control"] = "public, max-age=60"
+    return response
+
+
 def contact_us(request, pk):
     property = get_object_or_404(Property, pk=pk)
     if request.method == "POST":
@@ -146,6 +268,11 @@ def debug_featured(request):
     })
 
    
+@staff_member_required
+def debug_cache_stats(request):
+    return JsonResponse({"property_list_result_cache": result_cache_stats()})
+
+
 @staff_member_required
 def debug_config(request):
     return JsonResponse({
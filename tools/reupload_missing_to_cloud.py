@@ -1,16 +1,18 @@
 # tools/reupload_missing_to_cloud.py
 """
 Find Property image fields that are stored locally under MEDIA_ROOT (paths like
-/media/properties/...) and re-upload them using Django's default storage
-(CloudinaryStorage in your settings). Run from project root:
+/media/properties/...) and re-upload them to Cloudinary with the shared upload
+engine (listings/uploads.py: concurrent, rate-limited, retried, journalled -
+re-run after an interruption and it picks up where it stopped). Run from project root:
 
 PowerShell:
   $env:DJANGO_SETTINGS_MODULE="config.settings"
-  python -m tools.reupload_missing_to_cloud
+  python -m tools.reupload_missing_to_cloud [--limit N] [--workers 4] [--dry-run]
 
 Or make the file self-contained (below already sets the env var if missing).
 """
 
+import argparse
 import os
 from pathlib import Path
 import sys
@@ -22,7 +24,7 @@ django.setup()
 
 # --- Now safe to import Django libs and your models ---
 from django.conf import settings
-from django.core.files import File
+from listings import media_index, uploads
 from listings.models import Property   # your app model
 # ---------------------------------------------------------------
 
@@ -48,30 +50,38 @@ def find_non_cloud_props():
                 bad.append((p.pk, p.title, fname, name, url))
     return bad
 
-def try_reupload(item):
+def make_job(item):
+    """UploadJob for one (pk, title, field, name, url) item, or (None, reason) if it can't be uploaded."""
     pk, title, field_name, name, url = item
-    p = Property.objects.get(pk=pk)
-    f = getattr(p, field_name, None)
-    if not f:
-        return False, "field missing"
-    name = getattr(f, "name", None)
     if not name:
-        return False, "no saved name on field"
+        return None, "no saved name on field"
     local_path = MEDIA_ROOT / name
     # if name is something like 'properties/foo.jpg', MEDIA_ROOT / name works
     if not local_path.exists():
-        return False, f"local file not found at {local_path}"
-    # open and save using default storage (Cloudinary)
-    try:
-        with open(local_path, "rb") as fh:
-            django_file = File(fh)
-            # Use save(name, File, save=True) to upload and persist
-            getattr(p, field_name).save(os.path.basename(name), django_file, save=True)
-        return True, "reuploaded/field saved"
-    except Exception as exc:
-        return False, f"upload failed: {exc}"
+        return None, f"local file not found at {local_path}"
+    field = Property._meta.get_field(field_name)
+    # same options CloudinaryField.pre_save would have used
+    options = {"type": field.type, "resource_type": field.resource_type}
+    options.update({k: v for k, v in field.options.items() if not callable(v)})
+    return uploads.UploadJob(key=f"{pk}:{field_name}:{name}", source=str(local_path),
+                             options=options, payload=(pk, field_name)), "queued"
+
+
+def apply(result):
+    pk, field_name = result.job.payload
+    field = Property._meta.get_field(field_name)
+    value = media_index.resource(result.asset, resource_type=field.resource_type, upload_type=field.type)
+    p = Property.objects.get(pk=pk)
+    setattr(p, field_name, value)
+    p.save(update_fields=[field_name])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-upload local Property images to Cloudinary.")
+    parser.add_argument("--limit", type=int, default=0, help="Process at most N items (0 = all).")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be uploaded, without uploading.")
+    uploads.add_arguments(parser)
+    args = parser.parse_args(argv)
 
-def main():
     print(f"MEDIA_ROOT: {MEDIA_ROOT}")
     bad = find_non_cloud_props()
     print(f"Found {len(bad)} image fields that look local/not on Cloudinary.")
@@ -82,16 +92,29 @@ def main():
         pk, title, fname, name, url = item
         print(f"{i}. PK={pk} FIELD={fname} NAME={name!r} URL={url!r} TITLE={title!r}")
 
-    # safe default: process N items so you can review
-    N = 10
-    print(f"\nAttempting reupload for up to {N} items (first {N}).\n")
-    processed = 0
-    for item in bad[:N]:
-        success, msg = try_reupload(item)
-        pk = item[0]
-        print(f"PK={pk} => {success} : {msg}")
-        processed += 1
-    print(f"\nDone. Processed {processed} items. Re-run to process more.")
+    if args.limit:
+        bad = bad[:args.limit]
+    jobs = []
+    for item in bad:
+        job, msg = make_job(item)
+        if job is None:
+            print(f"PK={item[0]} FIELD={item[2]} => skipped : {msg}")
+        else:
+            jobs.append(job)
+    if args.dry_run:
+        print(f"\nDry run. Would upload {len(jobs)} items.")
+        return
+
+    print(f"\nUploading {len(jobs)} items with {args.workers} workers.\n")
+    journal = uploads.open_journal("reupload_missing_to_cloud", args.journal, args.restart)
+    try:
+        stats = uploads.run(jobs, apply, journal=journal, workers=args.workers, rate=args.rate,
+                            retries=args.retries, log=print)
+    finally:
+        journal.close()
+    print(f"\nDone. {stats.summary()}")
+    if stats.failed:
+        print("Re-run to retry the failed items; finished ones are skipped (journal).")
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,11 @@
 ﻿# tools/reupload_to_cloud.py
 import os
-from pathlib import Path
 os.environ.setdefault("DJANGO_SETTINGS_MODULE","config.settings")
 import django
 django.setup()
 
 from listings.models import Property
-from django.conf import settings
-from django.core.files import File
 
-MEDIA_ROOT = Path(getattr(settings, "MEDIA_ROOT", Path.cwd() / "media"))
 CLOUD_DOMAIN = "res.cloudinary.com"
 
 def find_non_cloud_props():
@@ -26,25 +22,6 @@ def find_non_cloud_props():
                 bad.append((p.pk, p.title, fname, name, url))
     return bad
 
-def try_reupload(item):
-    pk, title, field_name, name, url = item
-    p = Property.objects.get(pk=pk)
-    f = getattr(p, field_name, None)
-    if not f:
-        return False, "field missing"
-    name = getattr(f, "name", None)
-    if not name:
-        return False, "no saved name on field"
-    local_path = MEDIA_ROOT / name
-    if not local_path.exists():
-        return False, f"local file not found at {local_path}"
-    # open and save using default storage (Cloudinary)
-    with open(local_path, "rb") as fh:
-        django_file = File(fh)
-        # Use save(name, File, save=True) to upload and persist
-        getattr(p, field_name).save(os.path.basename(name), django_file, save=True)
-    return True, "reuploaded/field saved"
-
 if __name__ == "__main__":
     bad = find_non_cloud_props()
     print(f"Found {len(bad)} image fields without Cloudinary URLs.")
@@ -55,13 +32,8 @@ if __name__ == "__main__":
             pk, title, fname, name, url = item
             print(f"{i}. PK={pk} FIELD={fname} NAME={name!r} URL={url!r} TITLE={title!r}")
 
-        # how many to process in this run (safe default)
-        N = 5
-        print(f"\nAttempting reupload for up to {N} items (first {N}).\n")
-        processed = 0
-        for item in bad[:N]:
-            success, msg = try_reupload(item)
-            pk = item[0]
-            print(f"PK={pk} => {success} : {msg}")
-            processed += 1
-        print(f"\nDone. Processed {processed} items. Re-run to process more.")
+        # Deprecated: this used to re-upload the first 5 items per run, one by one.
+        # sync_media uploads only new/changed files (manifest), concurrently, and updates the DB in bulk.
+        print("\nreupload_to_cloud.py is deprecated; running `manage.py sync_media` instead.\n")
+        from django.core.management import call_command
+        call_command("sync_media")